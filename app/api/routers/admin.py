@@ -1,7 +1,8 @@
 # file: app/api/routers/admin.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 import shutil
+import traceback
 from psycopg2.extras import DictCursor
 
 from app.core import config
@@ -13,18 +14,31 @@ from app.services.rag_service import rag_service
 
 router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
 
+def _background_remove_documents(doc_ids: list[str]):
+    """Mengeluarkan vektor dokumen yang dihapus dari index di background (tanpa rebuild penuh)."""
+    if not doc_ids:
+        return
+    print(f"✅ Starting background task: Remove {len(doc_ids)} document(s) from index")
+    try:
+        rag_service.remove_documents(doc_ids)
+    except Exception:
+        print("❌ BACKGROUND INDEX REMOVAL FAILED:")
+        traceback.print_exc()
+
 @router.get("/stats", response_model=AdminStats)
 def get_admin_stats():
+    # Counter dipelihara oleh trigger (lihat setup.py), jadi tidak ada full scan per muat dashboard.
+    # total_chats tetap menghitung sesi yang partisinya sudah diarsipkan.
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_users = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM documents")
-        total_documents = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(DISTINCT session_id) FROM chat_history")
-        total_chats = cursor.fetchone()[0]
+        cursor.execute("SELECT name, value FROM app_counters WHERE name IN ('users', 'documents', 'chat_sessions')")
+        counters = dict(cursor.fetchall())
         cursor.close()
-    return AdminStats(total_users=total_users, total_documents=total_documents, total_chats=total_chats)
+    return AdminStats(
+        total_users=counters.get("users", 0),
+        total_documents=counters.get("documents", 0),
+        total_chats=counters.get("chat_sessions", 0)
+    )
 
 @router.get("/users", response_model=list[UserPublic])
 def get_all_users():
@@ -37,12 +51,15 @@ def get_all_users():
         return [dict(row) for row in users_rows]
 
 @router.delete("/users/{username}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(username: str, current_user: UserPublic = Depends(require_admin)):
+def delete_user(username: str, background_tasks: BackgroundTasks, current_user: UserPublic = Depends(require_admin)):
     if username == current_user.username:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tidak dapat menghapus akun sendiri.")
     
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        # Dokumen pengguna ikut terhapus (ON DELETE CASCADE); id-nya dicatat untuk dikeluarkan dari index
+        cursor.execute("DELETE FROM documents WHERE username = %s RETURNING id", (username,))
+        doc_ids = [row[0] for row in cursor.fetchall()]
         cursor.execute("DELETE FROM users WHERE username = %s", (username,))
         conn.commit()
         if cursor.rowcount == 0:
@@ -54,7 +71,7 @@ def delete_user(username: str, current_user: UserPublic = Depends(require_admin)
     if user_upload_dir.exists():
         shutil.rmtree(user_upload_dir)
     
-    rag_service.rebuild_index()
+    background_tasks.add_task(_background_remove_documents, doc_ids)
     return
 
 @router.get("/documents", response_model=list[DocumentDetail])
@@ -68,7 +85,7 @@ def get_all_documents_for_admin():
         return [dict(row) for row in documents_rows]
 
 @router.delete("/documents/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_document(document_id: str):
+def delete_document(document_id: str, background_tasks: BackgroundTasks):
     with get_db_connection() as conn:
         cursor = conn.cursor(cursor_factory=DictCursor)
         cursor.execute("SELECT file_path FROM documents WHERE id = %s", (document_id,))
@@ -85,5 +102,5 @@ def delete_document(document_id: str):
         conn.commit()
         cursor.close()
 
-    rag_service.rebuild_index()
+    background_tasks.add_task(_background_remove_documents, [document_id])
     return
@@ -1,7 +1,8 @@
 # file: app/api/routers/chat.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 import json
+import traceback
 from datetime import datetime
 from psycopg2.extras import DictCursor
 
@@ -9,20 +10,38 @@ from app.db.session import get_db_connection
 from app.api.deps import get_current_user
 from app.schemas.user import UserInDB
 from app.services.rag_service import rag_service
+from app.services import memory_service
 from app.schemas.chat import ChatMessage, ChatResponse, ChatHistoryItem
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
+def _background_compact_memory(session_id: str, username: str):
+    """Memperbarui ringkasan bergulir sesi setelah respons dikirim, agar panggilan LLM tidak menambah latensi chat."""
+    try:
+        memory_service.compact_memory(session_id, username, rag_service.summarize_turns)
+    except Exception:
+        print("❌ Gagal memperbarui ringkasan percakapan:")
+        traceback.print_exc()
+
 @router.post("", response_model=ChatResponse)
-def process_chat_message(message: ChatMessage, current_user: UserInDB = Depends(get_current_user)):
+def process_chat_message(
+    message: ChatMessage,
+    background_tasks: BackgroundTasks,
+    current_user: UserInDB = Depends(get_current_user)
+):
     if not rag_service.is_ready:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE, 
             detail="Sistem RAG tidak siap. Mohon coba lagi sesaat."
         )
 
+    memory = memory_service.load_memory(message.session_id, current_user.username)
+    answered = False
     try:
-        final_response = rag_service.invoke_chain(message.message, message.document_ids)
+        final_response = rag_service.invoke_chain(
+            message.message, message.document_ids, history=memory_service.format_for_prompt(memory)
+        )
+        answered = True
     except Exception as e:
         print(f"Error during RAG chain invocation: {e}")
         final_response = "Maaf, terjadi kesalahan saat memproses permintaan Anda. Silakan coba lagi."
@@ -40,14 +59,29 @@ def process_chat_message(message: ChatMessage, current_user: UserInDB = Depends(
         conn.commit()
         cursor.close()
 
+    if answered:
+        # Giliran mentah dicatat sebelum respons dikirim (murah, tanpa LLM) agar pesan lanjutan
+        # yang cepat sudah melihatnya; peringkasan menyusul di background.
+        try:
+            memory_service.append_turn(message.session_id, current_user.username, message.message, final_response)
+            background_tasks.add_task(_background_compact_memory, message.session_id, current_user.username)
+        except Exception:
+            print("❌ Gagal mencatat giliran ke memori percakapan:")
+            traceback.print_exc()
     return ChatResponse(response=final_response)
 
 @router.get("/history/{session_id}", response_model=list[ChatHistoryItem])
 def get_chat_session_history(session_id: str, current_user: UserInDB = Depends(get_current_user)):
     with get_db_connection() as conn:
         cursor = conn.cursor(cursor_factory=DictCursor)
-        query = "SELECT message, response, timestamp FROM chat_history WHERE session_id = %s AND username = %s ORDER BY timestamp ASC"
-        cursor.execute(query, (session_id, current_user.username))
+        # Batas bawah dari chat_sessions memungkinkan partition pruning: hanya partisi sejak sesi dimulai yang dibaca
+        query = """
+            SELECT message, response, timestamp FROM chat_history
+            WHERE session_id = %s AND username = %s
+              AND timestamp >= (SELECT started_at FROM chat_sessions WHERE username = %s AND session_id = %s)
+            ORDER BY timestamp ASC
+        """
+        cursor.execute(query, (session_id, current_user.username, current_user.username, session_id))
         history = cursor.fetchall()
         cursor.close()
     
@@ -17,13 +17,16 @@ from app.schemas.document import DocumentInfo
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
-def _background_rebuild_index():
-    """Fungsi helper untuk menjalankan rebuild di background."""
-    print("✅ Starting background task: Rebuild Index")
+def _background_index_documents(doc_rows: list[dict]):
+    """
+    Menambahkan dokumen yang baru diunggah ke index secara inkremental.
+    Rebuild penuh hanya dilakukan saat dokumen dihapus (admin) atau lewat CLI ingest.py.
+    """
+    print(f"✅ Starting background task: Index {len(doc_rows)} new document(s)")
     try:
-        rag_service.rebuild_index_from_db()
+        rag_service.add_documents(doc_rows)
     except Exception:
-        print("❌ BACKGROUND REBUILD FAILED:")
+        print("❌ BACKGROUND INDEXING FAILED:")
         traceback.print_exc()
 
 @router.post("/upload")
@@ -37,6 +40,7 @@ async def upload_documents(
     user_dir.mkdir(exist_ok=True)
     
     uploaded_docs_info = []
+    new_doc_rows = []
 
     for file in files:
         doc_id = str(uuid.uuid4())
@@ -56,6 +60,7 @@ async def upload_documents(
                     conn.commit()
             
             uploaded_docs_info.append({"id": doc_id, "filename": file.filename, "upload_date": datetime.now()})
+            new_doc_rows.append({"id": doc_id, "file_path": str(file_path.resolve()), "filename": file.filename})
 
         except Exception as e:
             if file_path.exists():
@@ -63,9 +68,9 @@ async def upload_documents(
             raise HTTPException(status_code=500, detail=f"Gagal menyimpan file {file.filename}: {e}")
 
     # Setelah SEMUA file berhasil diunggah dan disimpan di DB,
-    # picu SATU background task untuk membangun ulang seluruh index.
-    if uploaded_docs_info:
-        background_tasks.add_task(_background_rebuild_index)
+    # picu SATU background task yang hanya meng-embed dokumen baru tersebut.
+    if new_doc_rows:
+        background_tasks.add_task(_background_index_documents, new_doc_rows)
 
     return {"message": "File berhasil diterima. Proses indexing dimulai di latar belakang.", "uploaded_documents": uploaded_docs_info}
 
@@ -0,0 +1,48 @@
+# file: app/api/routers/search.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import get_current_user
+from app.schemas.user import UserInDB
+from app.schemas.search import ChatSearchResults, DocumentSearchResults
+from app.services import search_service
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+def _scope_username(current_user: UserInDB, all_users: bool) -> str | None:
+    """Pengguna biasa hanya mencari datanya sendiri; admin boleh mencari semua dengan all_users=true."""
+    if not all_users:
+        return current_user.username
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return None
+
+@router.get("/chats", response_model=ChatSearchResults)
+def search_chats(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    all_users: bool = False,
+    current_user: UserInDB = Depends(get_current_user)
+):
+    username = _scope_username(current_user, all_users)
+    try:
+        rows, next_cursor = search_service.search_chat_history(q, username, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ChatSearchResults(items=rows, next_cursor=next_cursor)
+
+@router.get("/documents", response_model=DocumentSearchResults)
+def search_documents(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    all_users: bool = False,
+    current_user: UserInDB = Depends(get_current_user)
+):
+    username = _scope_username(current_user, all_users)
+    try:
+        rows, next_cursor = search_service.search_document_chunks(q, username, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return DocumentSearchResults(items=rows, next_cursor=next_cursor)
@@ -30,3 +30,28 @@ FAISS_INDEX_PATH = VECTOR_STORE_DIR / "unnes_docs.faiss"
 
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
+
+# Interval pemeriksaan kesehatan latar belakang; /health hanya membaca hasil terakhir
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "15"))
+
+# Batas memori percakapan (estimasi token, ~4 karakter per token) agar ukuran prompt tetap terbatas
+MEMORY_RECENT_TURNS_MAX_TOKENS = int(os.getenv("MEMORY_RECENT_TURNS_MAX_TOKENS", "1200"))
+MEMORY_SUMMARY_MAX_TOKENS = int(os.getenv("MEMORY_SUMMARY_MAX_TOKENS", "400"))
+MEMORY_TURN_MAX_TOKENS = int(os.getenv("MEMORY_TURN_MAX_TOKENS", "400"))
+
+# Partisi bulanan chat_history: jumlah bulan ke depan yang disiapkan dan kebijakan retensi.
+# Retensi 0 = simpan selamanya. Partisi lama dipindah ke schema chat_archive, atau dihapus jika ARCHIVE=false.
+CHAT_HISTORY_PARTITIONS_AHEAD = int(os.getenv("CHAT_HISTORY_PARTITIONS_AHEAD", "3"))
+CHAT_HISTORY_RETENTION_MONTHS = int(os.getenv("CHAT_HISTORY_RETENTION_MONTHS", "24"))
+CHAT_HISTORY_ARCHIVE = os.getenv("CHAT_HISTORY_ARCHIVE", "true").lower() in ("1", "true", "yes")
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("MAINTENANCE_INTERVAL_SECONDS", str(6 * 60 * 60)))
+
+# Seberapa sering worker web memeriksa apakah index FAISS di disk sudah diganti (misalnya oleh ingest.py)
+INDEX_RELOAD_CHECK_SECONDS = float(os.getenv("INDEX_RELOAD_CHECK_SECONDS", "30"))
+# Batas jeda backoff saat warm-up RAG yang gagal diulang oleh index_watcher
+WARM_UP_RETRY_MAX_SECONDS = float(os.getenv("WARM_UP_RETRY_MAX_SECONDS", "300"))
+
+# Konfigurasi text search PostgreSQL untuk full-text search (harus sama saat setup.py dan saat query)
+SEARCH_TEXT_CONFIG = os.getenv("SEARCH_TEXT_CONFIG", "indonesian")
+if not SEARCH_TEXT_CONFIG.isidentifier():
+    raise ValueError("FATAL: SEARCH_TEXT_CONFIG harus berupa nama konfigurasi text search yang valid.")
@@ -0,0 +1,114 @@
+# file: app/core/metrics.py
+
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+logger = logging.getLogger("app.metrics")
+
+# Bucket dibuat lebar karena rentangnya dari query DB (milidetik) hingga rebuild index (menit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+RAG_STAGE_SECONDS = Histogram(
+    "rag_stage_duration_seconds",
+    "Durasi setiap tahap pipeline RAG.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+RAG_STAGE_ERRORS = Counter(
+    "rag_stage_errors_total",
+    "Jumlah error per tahap pipeline RAG.",
+    ["stage"],
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Durasi eksekusi query database.",
+    ["query"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Jumlah query database yang gagal.",
+    ["query"],
+)
+INDEX_VECTORS = Gauge(
+    "faiss_index_vectors",
+    "Jumlah vektor di dalam index FAISS yang sedang aktif.",
+    multiprocess_mode="max",
+)
+INDEX_CHUNKS = Gauge(
+    "faiss_index_chunks",
+    "Jumlah chunk yang dihasilkan pada rebuild index terakhir.",
+    multiprocess_mode="max",
+)
+INDEX_REBUILD_SECONDS = Histogram(
+    "faiss_index_rebuild_duration_seconds",
+    "Durasi rebuild index FAISS secara penuh.",
+    buckets=LATENCY_BUCKETS,
+)
+INDEX_REBUILDS = Counter(
+    "faiss_index_rebuilds_total",
+    "Jumlah rebuild index FAISS berdasarkan hasilnya.",
+    ["status"],
+)
+
+_SQL_TABLE_PATTERN = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE)\s+([A-Za-z_][A-Za-z0-9_.]*)", re.IGNORECASE)
+
+def query_label(sql) -> str:
+    """Label berkardinalitas rendah untuk sebuah query, misalnya 'select:users'."""
+    if isinstance(sql, bytes):
+        sql = sql.decode(errors="ignore")
+    sql = str(sql).strip()
+    if not sql:
+        return "unknown"
+    verb = sql.split(None, 1)[0].lower()
+    match = _SQL_TABLE_PATTERN.search(sql)
+    return f"{verb}:{match.group(1).lower()}" if match else verb
+
+@contextmanager
+def timed(stage: str):
+    """Span waktu untuk satu tahap RAG; dicatat ke histogram dan log."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        RAG_STAGE_ERRORS.labels(stage=stage).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        RAG_STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        logger.debug("span=%s duration_ms=%.1f", stage, elapsed * 1000)
+
+@contextmanager
+def timed_query(sql):
+    label = query_label(sql)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DB_QUERY_ERRORS.labels(query=label).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        DB_QUERY_SECONDS.labels(query=label).observe(elapsed)
+        logger.debug("span=db query=%s duration_ms=%.1f", label, elapsed * 1000)
+
+def render_latest() -> tuple[bytes, str]:
+    """Menghasilkan payload /metrics; menggabungkan semua worker jika mode multiprocess aktif."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
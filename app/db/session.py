@@ -1,17 +1,42 @@
 # file: app/db/session.py
 
 import psycopg2
+import psycopg2.extensions
 from contextlib import contextmanager
+from functools import lru_cache
 from fastapi import HTTPException
-from app.core import config
+from app.core import config, metrics
 
 DATABASE_URL = config.DATABASE_URL
 
+class _TimedCursorMixin:
+    """Mencatat durasi setiap execute() ke histogram db_query_duration_seconds."""
+
+    def execute(self, query, vars=None):
+        with metrics.timed_query(query):
+            return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        with metrics.timed_query(query):
+            return super().executemany(query, vars_list)
+
+@lru_cache(maxsize=None)
+def _timed_cursor_class(base: type) -> type:
+    return type(f"Timed{base.__name__}", (_TimedCursorMixin, base), {})
+
+class TimedConnection(psycopg2.extensions.connection):
+    """Koneksi yang membungkus cursor_factory apa pun (termasuk DictCursor) dengan timing."""
+
+    def cursor(self, *args, **kwargs):
+        base = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = _timed_cursor_class(base)
+        return super().cursor(*args, **kwargs)
+
 @contextmanager
 def get_db_connection():
     conn = None
     try:
-        conn = psycopg2.connect(DATABASE_URL)
+        conn = psycopg2.connect(DATABASE_URL, connection_factory=TimedConnection)
         yield conn
     except psycopg2.OperationalError as e:
         raise HTTPException(status_code=503, detail=f"Database connection error: {e}")
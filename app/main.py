@@ -1,23 +1,42 @@
 # app/main.py
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, status
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 
-from app.core import config
-from app.api.routers import auth, documents, chat, admin
-from app.db.session import get_db_connection
+from app.core import config, metrics
+from app.api.routers import auth, documents, chat, admin, search
+from app.services.health import health_monitor
+from app.services.maintenance import index_watcher, maintenance_worker
 from app.services.rag_service import rag_service
 
 # Membuat direktori yang diperlukan jika belum ada
 config.UPLOAD_DIR.mkdir(exist_ok=True)
 config.VECTOR_STORE_DIR.mkdir(exist_ok=True)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    health_monitor.start()
+    maintenance_worker.start()
+    # Index FAISS dan client LLM dimuat di latar belakang agar worker langsung
+    # bisa melayani auth dan riwayat chat; /health/ready menandai kapan RAG siap.
+    warm_up_task = asyncio.create_task(asyncio.to_thread(rag_service.warm_up))
+    warm_up_task.add_done_callback(lambda _: health_monitor.request_refresh())
+    index_watcher.start()
+    yield
+    warm_up_task.cancel()
+    index_watcher.stop()
+    maintenance_worker.stop()
+    health_monitor.stop()
+
 app = FastAPI(
     title="UNNES Document Chat System",
-    version="8.0.0"
+    version="8.0.0",
+    lifespan=lifespan
 )
 
 # Middleware CORS untuk mengizinkan semua origin
@@ -34,6 +53,7 @@ app.include_router(auth.router, prefix=config.API_V1_PREFIX)
 app.include_router(documents.router, prefix=config.API_V1_PREFIX)
 app.include_router(chat.router, prefix=config.API_V1_PREFIX)
 app.include_router(admin.router, prefix=config.API_V1_PREFIX)
+app.include_router(search.router, prefix=config.API_V1_PREFIX)
 
 # Mounting direktori statis untuk frontend (HTML, CSS, JS)
 STATIC_DIR = Path(__file__).parent / "static"
@@ -46,34 +66,28 @@ async def read_index():
 
 @app.get("/health", tags=["System"])
 def health_check():
-    """Endpoint untuk memeriksa status kesehatan sistem."""
-    db_status = "disconnected"
-    try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-            cursor.close()
-            db_status = "connected"
-    except Exception:
-        db_status = "disconnected"
+    """Endpoint untuk memeriksa status kesehatan sistem (dari hasil pemeriksaan latar belakang)."""
+    return health_monitor.snapshot()
 
-    rag_status = "connected" if rag_service.is_ready else "disconnected"
-    
-    llm_status = "unknown"
-    try:
-        if rag_service.retrieval_chain.combine_docs_chain.llm:
-            llm_status = "connected"
-        else:
-            llm_status = "disconnected"
-    except Exception:
-        llm_status = "disconnected"
-    
-    final_status = "healthy" if all(s == "connected" for s in [db_status, rag_status, llm_status]) else "degraded"
+@app.get("/health/live", tags=["System"])
+def liveness_check():
+    """Liveness: proses hidup dan event loop merespons. Tidak memeriksa dependensi."""
+    return {"status": "alive"}
 
-    return {
-        "status": final_status,
-        "database": db_status,
-        "rag_service": rag_status,
-        "llm_google_gemini": llm_status
+@app.get("/health/ready", tags=["System"])
+def readiness_check():
+    """Readiness: RAG sudah selesai warm-up dan pemeriksaan DB terakhir berhasil."""
+    snapshot = health_monitor.snapshot()
+    ready = rag_service.is_ready and snapshot["database"] == "connected"
+    body = {
+        "status": "ready" if ready else "not_ready",
+        "database": snapshot["database"],
+        "rag_service": "connected" if rag_service.is_ready else ("failed" if rag_service.warm_up_error else "warming_up"),
     }
+    return JSONResponse(content=body, status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Endpoint scrape Prometheus."""
+    payload, content_type = metrics.render_latest()
+    return Response(content=payload, media_type=content_type)
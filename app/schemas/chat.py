@@ -13,4 +13,14 @@ class ChatResponse(BaseModel):
 class ChatHistoryItem(BaseModel):
     sender: str
     content: str
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+
+class ChatTurn(BaseModel):
+    message: str
+    response: str
+
+class ConversationMemory(BaseModel):
+    """Memori bergulir per sesi: ringkasan giliran lama + beberapa giliran terakhir apa adanya."""
+    summary: str = ""
+    recent_turns: List[ChatTurn] = []
+    turn_count: int = 0
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+
+class ChatSearchHit(BaseModel):
+    id: int
+    session_id: str
+    username: str
+    timestamp: datetime
+    rank: float
+    message_highlight: str
+    response_highlight: str
+
+class DocumentSearchHit(BaseModel):
+    id: int
+    document_id: str
+    filename: str
+    username: str
+    page: int | None = None
+    rank: float
+    highlight: str
+
+class ChatSearchResults(BaseModel):
+    items: List[ChatSearchHit]
+    next_cursor: str | None = None
+
+class DocumentSearchResults(BaseModel):
+    items: List[DocumentSearchHit]
+    next_cursor: str | None = None
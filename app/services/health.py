@@ -0,0 +1,89 @@
+# file: app/services/health.py
+
+import threading
+import traceback
+from datetime import datetime, timezone
+
+from app.core import config
+from app.db.session import get_db_connection
+
+class HealthMonitor:
+    """
+    Menjalankan pemeriksaan kesehatan di thread latar belakang dan menyimpan hasil terakhirnya,
+    sehingga endpoint /health cukup membaca snapshot tanpa membuka koneksi DB setiap probe.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._snapshot = {
+            "status": "starting",
+            "database": "unknown",
+            "rag_service": "unknown",
+            "llm_google_gemini": "unknown",
+            "checked_at": None,
+        }
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval_seconds)
+
+    def request_refresh(self):
+        """Meminta pemeriksaan segera tanpa menunggu interval berikutnya (misalnya setelah warm-up RAG)."""
+        self._wake_event.set()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._snapshot)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                print("❌ Health check gagal:")
+                traceback.print_exc()
+            self._wake_event.wait(self.interval_seconds)
+            self._wake_event.clear()
+
+    def refresh(self):
+        db_status = self._check_database()
+
+        from app.services.rag_service import rag_service
+        rag_status = "connected" if rag_service.is_ready else "disconnected"
+        llm_status = "connected" if rag_service.llm is not None else "disconnected"
+
+        final_status = "healthy" if all(s == "connected" for s in [db_status, rag_status, llm_status]) else "degraded"
+        with self._lock:
+            self._snapshot = {
+                "status": final_status,
+                "database": db_status,
+                "rag_service": rag_status,
+                "llm_google_gemini": llm_status,
+                "checked_at": datetime.now(timezone.utc).isoformat(),
+            }
+
+    def _check_database(self) -> str:
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+                cursor.close()
+            return "connected"
+        except Exception:
+            return "disconnected"
+
+health_monitor = HealthMonitor(interval_seconds=config.HEALTH_CHECK_INTERVAL_SECONDS)
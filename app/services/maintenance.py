@@ -0,0 +1,85 @@
+# file: app/services/maintenance.py
+
+import threading
+import traceback
+
+from app.core import config
+from app.db.session import get_db_connection
+
+# Kunci advisory agar hanya satu worker yang menjalankan maintenance pada satu waktu
+_MAINTENANCE_LOCK_KEY = 730_001
+
+def run_chat_history_maintenance() -> dict:
+    """
+    Menyiapkan partisi bulanan chat_history ke depan dan menerapkan kebijakan retensi/arsip.
+    Idempoten; aman dijalankan dari banyak worker maupun dari cron (`python setup.py --maintenance`).
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (_MAINTENANCE_LOCK_KEY,))
+        if not cursor.fetchone()[0]:
+            conn.rollback()
+            cursor.close()
+            return {"skipped": True}
+
+        cursor.execute("SELECT chat_history_ensure_partitions(%s)", (config.CHAT_HISTORY_PARTITIONS_AHEAD,))
+        created = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT chat_history_apply_retention(%s, %s)",
+            (config.CHAT_HISTORY_RETENTION_MONTHS, config.CHAT_HISTORY_ARCHIVE)
+        )
+        removed = cursor.fetchone()[0]
+        conn.commit()
+        cursor.close()
+    return {"skipped": False, "partitions_created": created, "partitions_retired": removed}
+
+def _run_maintenance_logged():
+    result = run_chat_history_maintenance()
+    if result.get("partitions_created") or result.get("partitions_retired"):
+        print(f"🧹 Maintenance chat_history: {result}")
+
+def _reload_index_if_changed():
+    from app.services.health import health_monitor
+    from app.services.rag_service import rag_service
+
+    if not rag_service.is_ready:
+        # Warm-up yang gagal diulang di sini; tanpa ini /health/ready tetap 503 selamanya
+        if rag_service.retry_warm_up_if_due():
+            health_monitor.request_refresh()
+        return
+    rag_service.reload_if_changed()
+
+class PeriodicWorker:
+    """Menjalankan `target` secara berkala di thread latar belakang; error dicetak, tidak menghentikan loop."""
+
+    def __init__(self, name: str, interval_seconds: float, target):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.target = target
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.target()
+            except Exception:
+                print(f"❌ Tugas latar belakang '{self.name}' gagal:")
+                traceback.print_exc()
+            self._stop_event.wait(self.interval_seconds)
+
+maintenance_worker = PeriodicWorker("chat-history-maintenance", config.MAINTENANCE_INTERVAL_SECONDS, _run_maintenance_logged)
+# Mendeteksi index baru yang dipublikasikan worker lain atau CLI ingest.py, dan mengulang warm-up yang gagal
+index_watcher = PeriodicWorker("faiss-index-watcher", config.INDEX_RELOAD_CHECK_SECONDS, _reload_index_if_changed)
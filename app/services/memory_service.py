@@ -0,0 +1,138 @@
+# file: app/services/memory_service.py
+
+import json
+import traceback
+from typing import Callable
+from psycopg2.extras import DictCursor
+
+from app.core import config
+from app.db.session import get_db_connection
+from app.schemas.chat import ChatTurn, ConversationMemory
+
+# summarize(ringkasan_lama, giliran_yang_dikeluarkan) -> ringkasan_baru (None jika LLM tidak tersedia)
+Summarizer = Callable[[str, list[ChatTurn]], str | None]
+
+def estimate_tokens(text: str) -> int:
+    """Estimasi kasar (~4 karakter per token); cukup untuk menjaga batas ukuran prompt."""
+    return len(text) // 4 + 1 if text else 0
+
+def _truncate_to_tokens(text: str, max_tokens: int, keep_tail: bool = False) -> str:
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return "…" + text[-max_chars:].lstrip() if keep_tail else text[:max_chars].rstrip() + "…"
+
+def _turn_tokens(turn: ChatTurn) -> int:
+    return estimate_tokens(turn.message) + estimate_tokens(turn.response)
+
+def load_memory(session_id: str, username: str) -> ConversationMemory:
+    """Mengambil memori sesi dengan satu lookup primary key (tanpa membaca chat_history)."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=DictCursor)
+        cursor.execute(
+            "SELECT summary, recent_turns, turn_count FROM chat_session_memory WHERE username = %s AND session_id = %s",
+            (username, session_id)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+    if not row:
+        return ConversationMemory()
+    return ConversationMemory(summary=row["summary"], recent_turns=row["recent_turns"], turn_count=row["turn_count"])
+
+def _split_over_budget(turns: list[ChatTurn]) -> tuple[list[ChatTurn], list[ChatTurn]]:
+    """Memisahkan giliran terlama yang melewati MEMORY_RECENT_TURNS_MAX_TOKENS: (dikeluarkan, dipertahankan)."""
+    recent = list(turns)
+    evicted = []
+    while len(recent) > 1 and sum(_turn_tokens(t) for t in recent) > config.MEMORY_RECENT_TURNS_MAX_TOKENS:
+        evicted.append(recent.pop(0))
+    return evicted, recent
+
+def format_for_prompt(memory: ConversationMemory) -> str:
+    parts = []
+    if memory.summary:
+        parts.append(f"Ringkasan percakapan sebelumnya: {memory.summary}")
+    # Giliran yang belum sempat dilipat oleh compact_memory tidak ikut, agar prompt tetap terbatas
+    _, recent = _split_over_budget(memory.recent_turns)
+    for turn in recent:
+        parts.append(f"Pengguna: {turn.message}\nAsisten: {turn.response}")
+    return "\n".join(parts)
+
+def _fold_into_summary(summary: str, evicted: list[ChatTurn], summarize: Summarizer) -> str:
+    new_summary = None
+    try:
+        new_summary = summarize(summary, evicted)
+    except Exception:
+        print("⚠️ Gagal memperbarui ringkasan percakapan, memakai fallback.")
+        traceback.print_exc()
+
+    if new_summary:
+        return _truncate_to_tokens(new_summary.strip(), config.MEMORY_SUMMARY_MAX_TOKENS)
+
+    # Fallback tanpa LLM: simpan pertanyaan lama saja dan pertahankan bagian yang paling baru
+    fallback = " ".join([summary] + [f"Pengguna bertanya: {t.message}" for t in evicted]).strip()
+    return _truncate_to_tokens(fallback, config.MEMORY_SUMMARY_MAX_TOKENS, keep_tail=True)
+
+def append_turn(session_id: str, username: str, message: str, response: str):
+    """
+    Langkah sinkron setelah satu giliran chat: menambahkan giliran mentah ke recent_turns dengan satu
+    UPSERT atomik tanpa memanggil LLM, sehingga pesan berikutnya dari sesi yang sama langsung melihatnya.
+    Peringkasan dilakukan terpisah oleh compact_memory.
+    """
+    turn = ChatTurn(
+        message=_truncate_to_tokens(message, config.MEMORY_TURN_MAX_TOKENS),
+        response=_truncate_to_tokens(response, config.MEMORY_TURN_MAX_TOKENS),
+    )
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO chat_session_memory (username, session_id, recent_turns, turn_count)
+            VALUES (%s, %s, %s::jsonb, 1)
+            ON CONFLICT (username, session_id) DO UPDATE
+            SET recent_turns = chat_session_memory.recent_turns || EXCLUDED.recent_turns,
+                turn_count = chat_session_memory.turn_count + 1,
+                updated_at = NOW()
+            """,
+            (username, session_id, json.dumps([turn.model_dump()]))
+        )
+        conn.commit()
+        cursor.close()
+
+def compact_memory(session_id: str, username: str, summarize: Summarizer, max_attempts: int = 3) -> bool:
+    """
+    Melipat giliran terlama yang melewati batas token ke ringkasan yang sudah ada (dijalankan di background).
+    LLM dipanggil di luar transaksi; hasilnya diterapkan dengan UPDATE optimistis yang hanya berhasil jika
+    turn_count dan ringkasan belum berubah. Jika giliran baru masuk di antaranya, baris dibaca ulang dan
+    ringkasan yang sama tetap dipakai selama giliran yang dilipat masih berada di awal recent_turns.
+    """
+    memory = load_memory(session_id, username)
+    evicted, _ = _split_over_budget(memory.recent_turns)
+    if not evicted:
+        return False
+    base_summary = memory.summary
+    new_summary = _fold_into_summary(base_summary, evicted, summarize)
+
+    for _ in range(max_attempts):
+        if memory.summary != base_summary or memory.recent_turns[:len(evicted)] != evicted:
+            # Pemadatan lain sudah melipat giliran ini lebih dulu
+            return False
+        kept = memory.recent_turns[len(evicted):]
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                UPDATE chat_session_memory
+                SET summary = %s, recent_turns = %s, updated_at = NOW()
+                WHERE username = %s AND session_id = %s AND turn_count = %s AND summary = %s
+                """,
+                (new_summary, json.dumps([t.model_dump() for t in kept]), username, session_id, memory.turn_count, base_summary)
+            )
+            applied = cursor.rowcount == 1
+            conn.commit()
+            cursor.close()
+        if applied:
+            return True
+        memory = load_memory(session_id, username)
+
+    print(f"⚠️ Ringkasan sesi {session_id} tidak diterapkan setelah {max_attempts} percobaan; akan dicoba lagi di giliran berikutnya.")
+    return False
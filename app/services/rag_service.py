@@ -1,32 +1,147 @@
 # file: app/services/rag_service.py
 
+from __future__ import annotations
+
+from contextlib import contextmanager
 from pathlib import Path
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain.prompts import PromptTemplate
-from langchain.chains import RetrievalQA
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema.document import Document
-import google.generativeai as genai
-import pypdf
+from typing import TYPE_CHECKING
+import fcntl
+import os
+import shutil
 import traceback
 import threading
+import time
 
-from app.core import config
+from app.core import config, metrics
 from app.db.session import get_db_connection
+from app.services.search_service import store_document_chunks
 from psycopg2.extras import DictCursor
 
+# langchain, google-generativeai, pypdf, dan FAISS sengaja diimpor di dalam fungsi:
+# mengimpornya di level modul membuat setiap worker butuh beberapa detik sebelum bisa bind port.
+if TYPE_CHECKING:
+    from langchain.schema.document import Document
+
 index_lock = threading.Lock()
 
+@contextmanager
+def index_file_lock(index_path: Path):
+    """
+    Kunci antarproses (flock pada `.index.lock`) untuk urutan baca → gabung → publikasi index.
+    index_lock hanya berlaku di dalam satu proses, sedangkan worker web lain dan CLI ingest.py juga
+    mempublikasikan index. Jangan bersarang: flock kedua dari proses yang sama akan menunggu selamanya.
+    """
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(index_path.parent / ".index.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def create_embeddings():
+    """Client embedding Google yang dipakai bersama oleh RAGService dan ingest.py."""
+    import google.generativeai as genai
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    genai.configure(api_key=config.GOOGLE_API_KEY)
+    return GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+
+# Jumlah versi index lama yang disimpan agar pembaca yang baru saja membaca pointer masih bisa memuatnya
+KEEP_INDEX_VERSIONS = 3
+# Nama versi untuk index lama berformat datar (unnes_docs.faiss/.pkl langsung di VECTOR_STORE_DIR)
+LEGACY_INDEX_VERSION = "legacy"
+# Jeda awal sebelum warm-up yang gagal diulang; berlipat dua setiap kegagalan hingga WARM_UP_RETRY_MAX_SECONDS
+WARM_UP_RETRY_BASE_SECONDS = 10
+
+def _pointer_path(index_path: Path) -> Path:
+    return index_path.with_suffix(".current")
+
+def _versions_dir(index_path: Path) -> Path:
+    return index_path.parent / f"{index_path.stem}.versions"
+
+def index_version(index_path: Path) -> str | None:
+    """Nama versi index yang sedang aktif (isi file pointer), atau None jika belum ada index."""
+    try:
+        return _pointer_path(index_path).read_text().strip() or None
+    except FileNotFoundError:
+        return LEGACY_INDEX_VERSION if index_path.exists() else None
+
+def load_vector_store(index_path: Path, embeddings, version: str | None = None):
+    """Memuat index versi `version` (default: versi aktif), atau None jika belum ada index."""
+    from langchain_community.vectorstores import FAISS
+
+    version = version or index_version(index_path)
+    if version is None:
+        return None
+    folder = index_path.parent if version == LEGACY_INDEX_VERSION else _versions_dir(index_path) / version
+    return FAISS.load_local(
+        folder_path=str(folder), index_name=index_path.stem,
+        embeddings=embeddings, allow_dangerous_deserialization=True
+    )
+
+def _write_pointer(index_path: Path, version: str | None):
+    pointer = _pointer_path(index_path)
+    if version is None:
+        pointer.unlink(missing_ok=True)
+        return
+    tmp_pointer = pointer.with_name(f".{pointer.name}.{os.getpid()}-{threading.get_ident()}")
+    tmp_pointer.write_text(version)
+    os.replace(tmp_pointer, pointer)
+
+def _prune_versions(index_path: Path):
+    versions_dir = _versions_dir(index_path)
+    current = index_version(index_path)
+    versions = sorted(p for p in versions_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in versions[:-KEEP_INDEX_VERSIONS]:
+        if old.name != current:
+            shutil.rmtree(old, ignore_errors=True)
+
+def publish_vector_store(vector_store, index_path: Path) -> str:
+    """
+    Menyimpan index ke direktori versi baru, lalu mengganti file pointer `<stem>.current` dengan
+    satu os.replace. Pasangan .faiss/.pkl selalu dibaca dari direktori versi yang sama, sehingga
+    proses lain (worker web, CLI ingest.py) tidak pernah melihat pasangan yang setengah diganti.
+    """
+    versions_dir = _versions_dir(index_path)
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    version = f"{time.time_ns()}-{os.getpid()}"
+    staging_dir = versions_dir / f".staging-{version}-{threading.get_ident()}"
+    try:
+        vector_store.save_local(folder_path=str(staging_dir), index_name=index_path.stem)
+        os.rename(staging_dir, versions_dir / version)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    _write_pointer(index_path, version)
+    _prune_versions(index_path)
+    return version
+
+def docstore_ids_for_documents(vector_store, doc_ids: set[str]) -> list[str]:
+    """Id docstore FAISS untuk semua chunk milik dokumen `doc_ids` (berdasarkan metadata doc_id)."""
+    return [
+        docstore_id for docstore_id in vector_store.index_to_docstore_id.values()
+        if str(vector_store.docstore.search(docstore_id).metadata.get("doc_id")) in doc_ids
+    ]
+
+def clear_published_index(index_path: Path):
+    """Menghapus index aktif (misalnya setelah dokumen terakhir dihapus)."""
+    _write_pointer(index_path, None)
+    index_path.unlink(missing_ok=True)
+    index_path.with_suffix(".pkl").unlink(missing_ok=True)
+    shutil.rmtree(_versions_dir(index_path), ignore_errors=True)
+
 def _load_and_split_single_document(file_path: Path) -> list[Document]:
     """Helper untuk memuat satu dokumen dan membaginya menjadi chunks."""
+    import pypdf
+    from langchain.schema.document import Document
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
     ext = file_path.suffix.lower()
     documents = []
     try:
         print(f"  - Loading file: {file_path.name}")
         if ext == '.pdf':
-            with open(file_path, "rb") as pdf_file:
+            with metrics.timed("pdf_extract"), open(file_path, "rb") as pdf_file:
                 reader = pypdf.PdfReader(pdf_file)
                 for i, page in enumerate(reader.pages):
                     text = page.extract_text()
@@ -36,8 +151,9 @@ def _load_and_split_single_document(file_path: Path) -> list[Document]:
         if not documents:
             return []
 
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=config.CHUNK_SIZE, chunk_overlap=config.CHUNK_OVERLAP)
-        chunks = text_splitter.split_documents(documents)
+        with metrics.timed("chunking"):
+            text_splitter = RecursiveCharacterTextSplitter(chunk_size=config.CHUNK_SIZE, chunk_overlap=config.CHUNK_OVERLAP)
+            chunks = text_splitter.split_documents(documents)
         
         valid_chunks = [chunk for chunk in chunks if chunk.page_content and chunk.page_content.strip()]
         return valid_chunks
@@ -48,105 +164,326 @@ def _load_and_split_single_document(file_path: Path) -> list[Document]:
         return []
 
 class RAGService:
-    def __init__(self):
+    def __init__(self, embeddings=None, llm=None, index_path: Path | None = None, chunk_store=None):
+        """
+        Secara default memakai Google Generative AI dan path index dari config.
+        `embeddings`, `llm`, dan `index_path` bisa diganti (misalnya oleh suite benchmark)
+        agar service dapat dijalankan tanpa API eksternal. `chunk_store(chunks)`, jika diisi,
+        menerima setiap chunk yang dimuat (dipakai untuk full-text search di PostgreSQL).
+
+        Konstruktor tidak melakukan pekerjaan berat; panggil `warm_up()` untuk
+        memuat client dan index (di aplikasi web ini dilakukan oleh lifespan di app/main.py).
+        """
         self.vector_store = None
-        self.retrieval_chain = None
+        self.llm = None
+        self.prompt = None
+        self.condense_prompt = None
+        self.summary_prompt = None
         self.is_ready = False
+        self.warm_up_error = None
+        self.index_path = Path(index_path) if index_path else config.FAISS_INDEX_PATH
+        self.embeddings = embeddings
+        self._llm_override = llm
+        self._chunk_store = chunk_store
+        self._init_lock = threading.Lock()
+        self._warm_up_lock = threading.Lock()
+        self._warm_up_failures = 0
+        self._next_warm_up_at = None
+        self._loaded_version = None
+
+    def _init_clients(self):
+        """Mengonfigurasi Google API dan embeddings sekali saja (idempoten)."""
+        with self._init_lock:
+            if self.embeddings is not None:
+                return
+            self.embeddings = create_embeddings()
+
+    def warm_up(self):
+        """Memuat client, index FAISS, dan chain. Aman dipanggil berkali-kali (panggilan bersamaan dilewati)."""
+        if self.is_ready or not self._warm_up_lock.acquire(blocking=False):
+            return
+        start = time.perf_counter()
         try:
-            genai.configure(api_key=config.GOOGLE_API_KEY)
-            self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+            self._init_clients()
             self._load_vector_store()
             self._create_retrieval_chain()
             self.is_ready = True
-            print("✅ RAG Service Initialized.")
-        except Exception:
-            print("❌ CRITICAL ERROR: Failed to initialize RAG Service.")
+            self.warm_up_error = None
+            self._warm_up_failures = 0
+            self._next_warm_up_at = None
+            print(f"✅ RAG Service Initialized in {time.perf_counter() - start:.2f}s.")
+        except Exception as e:
+            self.warm_up_error = str(e)
+            self._warm_up_failures += 1
+            delay = min(config.WARM_UP_RETRY_MAX_SECONDS, WARM_UP_RETRY_BASE_SECONDS * 2 ** (self._warm_up_failures - 1))
+            self._next_warm_up_at = time.monotonic() + delay
+            print(f"❌ CRITICAL ERROR: Failed to initialize RAG Service (attempt {self._warm_up_failures}, retrying in {delay:.0f}s).")
             traceback.print_exc()
+        finally:
+            self._warm_up_lock.release()
+
+    def retry_warm_up_if_due(self) -> bool:
+        """
+        Mengulang warm-up yang gagal dengan backoff eksponensial (dipanggil berkala oleh index_watcher),
+        agar gangguan sementara saat startup (DB, Google API, index) tidak membuat worker tidak pernah siap.
+        Mengembalikan True jika service baru saja menjadi siap.
+        """
+        if self.is_ready or self._next_warm_up_at is None or time.monotonic() < self._next_warm_up_at:
+            return False
+        print("🔁 Retrying RAG Service warm-up...")
+        self.warm_up()
+        return self.is_ready
 
     def _load_vector_store(self):
         with index_lock:
-            if config.FAISS_INDEX_PATH.exists():
-                print(f"🚀 Loading existing FAISS index...")
-                self.vector_store = FAISS.load_local(
-                    folder_path=str(config.FAISS_INDEX_PATH.parent), 
-                    index_name=config.FAISS_INDEX_PATH.stem,
-                    embeddings=self.embeddings,
-                    allow_dangerous_deserialization=True
-                )
+            version = index_version(self.index_path)
+            if version is not None:
+                print(f"🚀 Loading existing FAISS index (version {version})...")
+                self.vector_store = load_vector_store(self.index_path, self.embeddings, version)
                 print("✅ Index loaded.")
             else:
                 print("⚠️ FAISS index not found. Will be created on first upload.")
                 self.vector_store = None
+            # Dicatat hanya setelah berhasil dimuat, agar reload_if_changed mencoba lagi jika pemuatan gagal
+            self._loaded_version = version
+            self._update_index_metrics()
+
+    def _update_index_metrics(self):
+        metrics.INDEX_VECTORS.set(self.vector_store.index.ntotal if self.vector_store else 0)
 
     def _create_retrieval_chain(self):
+        # Retrieval dan generasi dijalankan sebagai langkah terpisah di invoke_chain
+        # agar embedding query, pencarian FAISS, dan panggilan LLM bisa diukur sendiri-sendiri.
         if not self.vector_store:
-            self.retrieval_chain = None
+            self.llm = None
+            self.prompt = None
+            self.condense_prompt = None
+            self.summary_prompt = None
             return
-        
-        llm = ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.3, convert_system_message_to_human=True)
-        prompt_template_text = "Gunakan konteks berikut untuk menjawab pertanyaan.\nKonteks: {context}\nPertanyaan: {question}\nJawaban:"
-        prompt = PromptTemplate(template=prompt_template_text, input_variables=["context", "question"])
-        
-        self.retrieval_chain = RetrievalQA.from_chain_type(
-            llm=llm, chain_type="stuff",
-            retriever=self.vector_store.as_retriever(search_kwargs={"k": 5}),
-            chain_type_kwargs={"prompt": prompt}
+
+        from langchain.prompts import PromptTemplate
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        self.llm = self._llm_override or ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.3, convert_system_message_to_human=True)
+        prompt_template_text = "Gunakan konteks dan riwayat percakapan berikut untuk menjawab pertanyaan.\nRiwayat percakapan: {history}\nKonteks: {context}\nPertanyaan: {question}\nJawaban:"
+        self.prompt = PromptTemplate(template=prompt_template_text, input_variables=["history", "context", "question"])
+        condense_template_text = (
+            "Berdasarkan riwayat percakapan berikut, tulis ulang pertanyaan lanjutan menjadi pertanyaan mandiri "
+            "yang bisa dipahami tanpa riwayat. Jawab hanya dengan pertanyaan tersebut.\n"
+            "Riwayat percakapan: {history}\nPertanyaan lanjutan: {question}\nPertanyaan mandiri:"
+        )
+        self.condense_prompt = PromptTemplate(template=condense_template_text, input_variables=["history", "question"])
+        summary_template_text = (
+            "Perbarui ringkasan percakapan dengan giliran baru berikut. Pertahankan topik, dokumen, dan fakta penting "
+            "secara singkat (maksimal {max_words} kata).\nRingkasan saat ini: {summary}\nGiliran baru:\n{turns}\nRingkasan baru:"
         )
+        self.summary_prompt = PromptTemplate(template=summary_template_text, input_variables=["max_words", "summary", "turns"])
         print("✅ Retrieval chain created/updated.")
 
+    def _load_chunks(self, doc_rows) -> list[Document]:
+        """Memuat dan memecah dokumen dari baris tabel `documents` (butuh kunci file_path & filename)."""
+        all_chunks = []
+        for doc in doc_rows:
+            file_path = Path(doc['file_path'])
+            if file_path.exists():
+                chunks = _load_and_split_single_document(file_path)
+                for chunk in chunks:
+                    chunk.metadata.update({"doc_id": doc.get('id', 'N/A'), "filename": doc['filename']})
+                all_chunks.extend(chunks)
+        if self._chunk_store and all_chunks:
+            try:
+                self._chunk_store(all_chunks)
+            except Exception:
+                # Kegagalan menyimpan teks untuk pencarian tidak boleh menggagalkan indexing
+                print("⚠️ Failed to store chunks for full-text search.")
+                traceback.print_exc()
+        return all_chunks
+
+    def _embed_chunks(self, chunks: list[Document]):
+        self._init_clients()
+        texts = [chunk.page_content for chunk in chunks]
+        with metrics.timed("embedding"):
+            vectors = self.embeddings.embed_documents(texts)
+        return list(zip(texts, vectors)), [chunk.metadata for chunk in chunks]
+
+    def _save_vector_store(self):
+        self._loaded_version = publish_vector_store(self.vector_store, self.index_path)
+
+    def reload_if_changed(self) -> bool:
+        """
+        Memuat ulang index jika pointer versi di disk sudah diganti oleh proses lain
+        (worker lain setelah upload, atau CLI ingest.py). Dipanggil berkala oleh index_watcher.
+        """
+        if not self.is_ready or index_version(self.index_path) == self._loaded_version:
+            return False
+        print("🔄 FAISS index changed on disk, reloading...")
+        self._load_vector_store()
+        self._create_retrieval_chain()
+        return True
+
     def rebuild_index_from_db(self):
         """
         Membangun ulang seluruh index FAISS dari semua dokumen yang ada di database.
         Ini adalah metode yang paling kuat untuk memastikan konsistensi.
         """
-        with index_lock:
+        self._rebuild_index(self._indexed_documents_from_db)
+
+    def rebuild_index_from_rows(self, doc_rows):
+        """Membangun ulang index dari daftar dokumen yang sudah diambil (tanpa akses DB)."""
+        self._rebuild_index(lambda: doc_rows)
+
+    @staticmethod
+    def _indexed_documents_from_db():
+        with get_db_connection() as conn:
+            cursor = conn.cursor(cursor_factory=DictCursor)
+            cursor.execute("SELECT id, file_path, filename FROM documents WHERE is_indexed = TRUE")
+            all_docs = cursor.fetchall()
+            cursor.close()
+        return all_docs
+
+    def _rebuild_index(self, load_rows):
+        # Daftar dokumen dibaca setelah kunci didapat, agar dokumen yang baru saja
+        # dipublikasikan ingest.py (is_indexed berubah menjadi TRUE) ikut terbaca.
+        with index_file_lock(self.index_path), index_lock:
             print(" rebuilding FAISS index from all documents in DB...")
-            all_chunks = []
-            
-            with get_db_connection() as conn:
-                cursor = conn.cursor(cursor_factory=DictCursor)
-                cursor.execute("SELECT file_path, filename FROM documents WHERE is_indexed = TRUE")
-                all_docs = cursor.fetchall()
-                cursor.close()
-
-            if not all_docs:
-                print("No indexed documents found in DB. Clearing index if it exists.")
-                if config.FAISS_INDEX_PATH.exists():
-                    config.FAISS_INDEX_PATH.unlink()
-                    (config.FAISS_INDEX_PATH.parent / f"{config.FAISS_INDEX_PATH.stem}.pkl").unlink(missing_ok=True)
+            start = time.perf_counter()
+            try:
+                self._rebuild_index_locked(load_rows())
+            except Exception:
+                metrics.INDEX_REBUILDS.labels(status="failed").inc()
+                raise
+            metrics.INDEX_REBUILD_SECONDS.observe(time.perf_counter() - start)
+            metrics.INDEX_REBUILDS.labels(status="success").inc()
+
+    def _rebuild_index_locked(self, all_docs):
+        if not all_docs:
+            print("No indexed documents found in DB. Clearing index if it exists.")
+            clear_published_index(self.index_path)
+            self._loaded_version = None
+            self.vector_store = None
+            self._create_retrieval_chain()
+            metrics.INDEX_CHUNKS.set(0)
+            self._update_index_metrics()
+            return
+
+        print(f"Found {len(all_docs)} documents to process for re-indexing.")
+        all_chunks = self._load_chunks(all_docs)
+        
+        if not all_chunks:
+            print("No valid content could be extracted from documents. Index will not be created.")
+            return
+
+        from langchain_community.vectorstores import FAISS
+
+        print(f"Creating new index from {len(all_chunks)} total chunks...")
+        metrics.INDEX_CHUNKS.set(len(all_chunks))
+        text_embeddings, metadatas = self._embed_chunks(all_chunks)
+        # Buat index baru dari awal
+        self.vector_store = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas)
+        self._update_index_metrics()
+        
+        # Simpan index yang baru dan segar
+        self._save_vector_store()
+        # Buat ulang chain dengan retriever yang baru
+        self._create_retrieval_chain()
+        print("✅ Index rebuild complete and saved.")
+
+    def add_documents(self, doc_rows):
+        """
+        Menambahkan dokumen baru ke index yang sudah ada tanpa membangun ulang semuanya.
+        Index yang sedang dipakai untuk pencarian tidak pernah diubah di tempat (FAISS tidak aman
+        ditulis sambil dibaca thread lain): vektor baru digabung ke salinan, lalu referensinya ditukar.
+        """
+        chunks = self._load_chunks(doc_rows)
+        if not chunks:
+            return 0
+        from langchain_community.vectorstores import FAISS
+
+        text_embeddings, metadatas = self._embed_chunks(chunks)
+        new_store = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas)
+        with index_file_lock(self.index_path), index_lock:
+            # Salinan diambil dari versi yang dipublikasikan saat ini (bisa lebih baru dari milik
+            # worker ini karena worker lain atau ingest.py), agar publikasi ini tidak menghapus isinya.
+            current = load_vector_store(self.index_path, self.embeddings)
+            if current is not None:
+                current.merge_from(new_store)
+                new_store = current
+            self._swap_vector_store(new_store)
+        return len(chunks)
+
+    def remove_documents(self, doc_ids) -> int:
+        """
+        Mengeluarkan vektor dokumen yang dihapus dari index tanpa rebuild penuh.
+        Seperti add_documents, penghapusan dilakukan pada salinan index yang dipublikasikan.
+        """
+        doc_ids = {str(doc_id) for doc_id in doc_ids}
+        with index_file_lock(self.index_path), index_lock:
+            current = load_vector_store(self.index_path, self.embeddings)
+            stale_ids = docstore_ids_for_documents(current, doc_ids) if current is not None else []
+            if not stale_ids:
+                return 0
+            current.delete(stale_ids)
+            if current.index.ntotal == 0:
+                print("No vectors left after deletion. Clearing index.")
+                clear_published_index(self.index_path)
+                self._loaded_version = None
                 self.vector_store = None
                 self._create_retrieval_chain()
-                return
-
-            print(f"Found {len(all_docs)} documents to process for re-indexing.")
-            for doc in all_docs:
-                file_path = Path(doc['file_path'])
-                if file_path.exists():
-                    chunks = _load_and_split_single_document(file_path)
-                    for chunk in chunks:
-                        chunk.metadata.update({"doc_id": doc.get('id', 'N/A'), "filename": doc['filename']})
-                    all_chunks.extend(chunks)
-            
-            if not all_chunks:
-                print("No valid content could be extracted from documents. Index will not be created.")
-                return
+                self._update_index_metrics()
+            else:
+                self._swap_vector_store(current)
+        return len(stale_ids)
 
-            print(f"Creating new index from {len(all_chunks)} total chunks...")
-            # Buat index baru dari awal
-            self.vector_store = FAISS.from_documents(all_chunks, self.embeddings)
-            
-            # Simpan index yang baru dan segar
-            self.vector_store.save_local(
-                folder_path=str(config.FAISS_INDEX_PATH.parent),
-                index_name=config.FAISS_INDEX_PATH.stem
-            )
-            # Buat ulang chain dengan retriever yang baru
+    def _swap_vector_store(self, new_store):
+        """Mempublikasikan `new_store` lalu menjadikannya index aktif (dipanggil di bawah kedua kunci index)."""
+        had_chain = self.vector_store is not None
+        self._loaded_version = publish_vector_store(new_store, self.index_path)
+        self.vector_store = new_store
+        if not had_chain:
             self._create_retrieval_chain()
-            print("✅ Index rebuild complete and saved.")
+        self._update_index_metrics()
+
+    def invoke_chain(self, query: str, document_ids: list, history: str = ""):
+        """
+        `history` adalah memori sesi yang sudah diformat (lihat memory_service.format_for_prompt).
+        Jika ada, pertanyaan lanjutan ditulis ulang menjadi pertanyaan mandiri sebelum pencarian
+        agar retrieval tidak gagal pada pertanyaan seperti "bagaimana dengan poin kedua?".
+        """
+        # Referensi diambil sekali: add_documents/reload bisa menukar index di tengah permintaan ini
+        vector_store = self.vector_store
+        if not (vector_store and self.llm):
+            return "Sistem chat belum siap. Silakan unggah dokumen terlebih dahulu."
+
+        search_query = query
+        if history:
+            with metrics.timed("query_condense"):
+                condensed = self.llm.invoke(self.condense_prompt.format(history=history, question=query)).content
+            search_query = (condensed or "").strip() or query
+
+        with metrics.timed("query_embedding"):
+            query_vector = self.embeddings.embed_query(search_query)
+        with metrics.timed("faiss_search"):
+            docs = vector_store.similarity_search_by_vector(query_vector, k=5)
+        if not docs:
+            return "Tidak dapat menemukan jawaban dari dokumen."
+
+        context = "\n\n".join(doc.page_content for doc in docs)
+        with metrics.timed("llm_generation"):
+            result = self.llm.invoke(self.prompt.format(history=history or "-", context=context, question=query))
+        return result.content or "Tidak dapat menemukan jawaban dari dokumen."
 
-    def invoke_chain(self, query: str, document_ids: list):
-        if self.retrieval_chain:
-            return self.retrieval_chain.invoke(query).get("result", "Tidak dapat menemukan jawaban dari dokumen.")
-        return "Sistem chat belum siap. Silakan unggah dokumen terlebih dahulu."
+    def summarize_turns(self, previous_summary: str, turns) -> str | None:
+        """Melipat giliran lama ke ringkasan yang ada (dipakai oleh memory_service). None jika LLM belum siap."""
+        if not self.llm:
+            return None
+        turns_text = "\n".join(f"Pengguna: {t.message}\nAsisten: {t.response}" for t in turns)
+        with metrics.timed("memory_summarize"):
+            result = self.llm.invoke(self.summary_prompt.format(
+                max_words=config.MEMORY_SUMMARY_MAX_TOKENS * 3 // 4,
+                summary=previous_summary or "-",
+                turns=turns_text
+            ))
+        return result.content
 
-rag_service = RAGService()
+# Instance bersama; murah dibuat, warm_up() dipanggil oleh lifespan aplikasi
+rag_service = RAGService(chunk_store=store_document_chunks)
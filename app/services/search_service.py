@@ -0,0 +1,130 @@
+# file: app/services/search_service.py
+
+import base64
+import json
+from psycopg2.extras import DictCursor, execute_values
+
+from app.core import config
+from app.db.session import get_db_connection
+
+# Opsi ts_headline: potongan pendek di sekitar kata yang cocok, ditandai <mark>
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+def encode_cursor(rank: float, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, row_id]).encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    """ValueError jika cursor tidak valid."""
+    try:
+        rank, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(row_id)
+    except Exception as e:
+        raise ValueError("Cursor tidak valid.") from e
+
+def store_document_chunks(chunks):
+    """
+    Menyimpan teks chunk ke document_chunks untuk full-text search. Isi dokumen tidak berubah,
+    jadi dokumen yang chunk-nya sudah tersimpan dilewati (rebuild index tidak menulis ulang).
+    """
+    by_document = {}
+    for chunk in chunks:
+        doc_id = chunk.metadata.get("doc_id")
+        if doc_id and doc_id != "N/A":
+            by_document.setdefault(doc_id, []).append(chunk)
+    if not by_document:
+        return
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT DISTINCT document_id FROM document_chunks WHERE document_id = ANY(%s)",
+            (list(by_document),)
+        )
+        already_stored = {row[0] for row in cursor.fetchall()}
+        values = [
+            (doc_id, index, chunk.metadata.get("page"), chunk.page_content)
+            for doc_id, doc_chunks in by_document.items() if doc_id not in already_stored
+            for index, chunk in enumerate(doc_chunks)
+        ]
+        if values:
+            execute_values(
+                cursor,
+                "INSERT INTO document_chunks (document_id, chunk_index, page, content) VALUES %s ON CONFLICT DO NOTHING",
+                values
+            )
+        conn.commit()
+        cursor.close()
+
+def _run_ranked_search(hits_sql: str, hits_params: list, headline_sql: str, headline_params: list,
+                       cursor_value: str | None, limit: int):
+    """
+    Menjalankan query pencarian dengan keyset pagination pada (rank, id).
+    `hits_sql` harus menghasilkan kolom id, rank, dan query (tsquery); ts_headline hanya
+    dihitung untuk baris di halaman yang dikembalikan karena fungsi ini mahal.
+    """
+    keyset_sql = ""
+    keyset_params = []
+    if cursor_value:
+        keyset_sql = "WHERE (hits.rank, hits.id) < (%s::real, %s)"
+        keyset_params = list(decode_cursor(cursor_value))
+
+    sql = f"""
+        WITH hits AS ({hits_sql}),
+        page AS (
+            SELECT * FROM hits {keyset_sql}
+            ORDER BY rank DESC, id DESC
+            LIMIT %s
+        )
+        {headline_sql}
+        ORDER BY page.rank DESC, page.id DESC
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=DictCursor)
+        cursor.execute(sql, hits_params + keyset_params + [limit + 1] + headline_params)
+        rows = [dict(row) for row in cursor.fetchall()]
+        cursor.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["rank"], rows[-1]["id"])
+    return rows, next_cursor
+
+def search_chat_history(query: str, username: str | None, limit: int, cursor_value: str | None = None):
+    """Mencari pesan/respons di chat_history. `username=None` berarti semua pengguna (admin)."""
+    ts_config = config.SEARCH_TEXT_CONFIG
+    user_filter = "AND ch.username = %s" if username else ""
+    hits_sql = f"""
+        SELECT ch.id, ch.session_id, ch.username, ch.timestamp, ch.message, ch.response, q.query,
+               ts_rank_cd(ch.search_tsv, q.query) AS rank
+        FROM chat_history ch, websearch_to_tsquery('{ts_config}', %s) AS q(query)
+        WHERE ch.search_tsv @@ q.query {user_filter}
+    """
+    headline_sql = f"""
+        SELECT page.id, page.session_id, page.username, page.timestamp, page.rank,
+               ts_headline('{ts_config}', page.message, page.query, %s) AS message_highlight,
+               ts_headline('{ts_config}', page.response, page.query, %s) AS response_highlight
+        FROM page
+    """
+    hits_params = [query] + ([username] if username else [])
+    return _run_ranked_search(hits_sql, hits_params, headline_sql, [HEADLINE_OPTIONS, HEADLINE_OPTIONS], cursor_value, limit)
+
+def search_document_chunks(query: str, username: str | None, limit: int, cursor_value: str | None = None):
+    """Mencari teks chunk dokumen. `username=None` berarti dokumen semua pengguna (admin)."""
+    ts_config = config.SEARCH_TEXT_CONFIG
+    user_filter = "AND d.username = %s" if username else ""
+    hits_sql = f"""
+        SELECT dc.id, dc.document_id, d.filename, d.username, dc.page, dc.content, q.query,
+               ts_rank_cd(dc.search_tsv, q.query) AS rank
+        FROM document_chunks dc
+        JOIN documents d ON d.id = dc.document_id,
+             websearch_to_tsquery('{ts_config}', %s) AS q(query)
+        WHERE dc.search_tsv @@ q.query {user_filter}
+    """
+    headline_sql = f"""
+        SELECT page.id, page.document_id, page.filename, page.username, page.page, page.rank,
+               ts_headline('{ts_config}', page.content, page.query, %s) AS highlight
+        FROM page
+    """
+    hits_params = [query] + ([username] if username else [])
+    return _run_ranked_search(hits_sql, hits_params, headline_sql, [HEADLINE_OPTIONS], cursor_value, limit)
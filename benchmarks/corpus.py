@@ -0,0 +1,76 @@
+# file: benchmarks/corpus.py
+
+import random
+from pathlib import Path
+
+# Kosakata akademik sederhana agar teks sintetis mirip skripsi/laporan dan chunking realistis
+_VOCABULARY = (
+    "penelitian analisis metode data hasil pembahasan kesimpulan mahasiswa universitas semarang "
+    "pendidikan pembelajaran evaluasi kurikulum teknologi informasi sistem model pengujian responden "
+    "kuesioner variabel signifikan regresi validitas reliabilitas populasi sampel observasi wawancara "
+    "literatur teori kerangka konsep implementasi efektivitas kualitas kinerja strategi pengembangan "
+    "lingkungan masyarakat ekonomi kebijakan hukum kesehatan olahraga seni bahasa budaya matematika"
+).split()
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(_VOCABULARY, k=rng.randint(8, 18))
+    return " ".join(words).capitalize() + "."
+
+def _escape_pdf_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_pdf(path: Path, pages: list[list[str]]):
+    """Menulis PDF minimal (Helvetica, satu stream teks per halaman) yang bisa dibaca pypdf."""
+    objects = []
+    page_ids = []
+    font_id = 3
+    objects.append(None)  # 1: catalog (diisi belakangan)
+    objects.append(None)  # 2: pages (diisi belakangan)
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for lines in pages:
+        stream_lines = ["BT", "/F1 10 Tf", "12 TL", "50 800 Td"]
+        for line in lines:
+            stream_lines.append(f"({_escape_pdf_text(line)}) Tj T*")
+        stream_lines.append("ET")
+        stream = "\n".join(stream_lines).encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (content_id, font_id)
+        )
+        page_ids.append(len(objects))
+
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids).encode()
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    path.write_bytes(bytes(output))
+
+def generate_corpus(target_dir: Path, num_documents: int, pages_per_document: int = 5,
+                    lines_per_page: int = 50, seed: int = 42) -> list[dict]:
+    """
+    Membuat korpus PDF sintetis yang deterministik (berdasarkan `seed`).
+    Mengembalikan baris berbentuk tabel `documents` (id, filename, file_path) untuk RAGService.
+    """
+    target_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    rows = []
+    for index in range(num_documents):
+        pages = [[_sentence(rng) for _ in range(lines_per_page)] for _ in range(pages_per_document)]
+        doc_id = f"bench-{seed}-{index:05d}"
+        file_path = target_dir / f"{doc_id}.pdf"
+        write_pdf(file_path, pages)
+        rows.append({"id": doc_id, "filename": f"skripsi_{index:05d}.pdf", "file_path": str(file_path)})
+    return rows
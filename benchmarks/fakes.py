@@ -0,0 +1,66 @@
+# file: benchmarks/fakes.py
+
+import hashlib
+import math
+import re
+import time
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+class FakeEmbeddings(Embeddings):
+    """
+    Pengganti GoogleGenerativeAIEmbeddings yang deterministik.
+    Vektor dibuat dari hashing token (bag-of-words) sehingga pencarian FAISS tetap bermakna,
+    dan latensi API disimulasikan dengan `sleep`.
+    """
+
+    def __init__(self, dim: int = 768, latency_seconds: float = 0.05, per_text_seconds: float = 0.002):
+        self.dim = dim
+        self.latency_seconds = latency_seconds
+        self.per_text_seconds = per_text_seconds
+
+    def _vector(self, text: str) -> list[float]:
+        vector = [0.0] * self.dim
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _simulate_latency(self, count: int):
+        delay = self.latency_seconds + self.per_text_seconds * count
+        if delay > 0:
+            time.sleep(delay)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self._simulate_latency(len(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        self._simulate_latency(1)
+        return self._vector(text)
+
+class FakeChatModel:
+    """
+    Pengganti ChatGoogleGenerativeAI dengan antarmuka `invoke()` yang sama dengan yang dipakai RAGService.
+    Latensi = waktu dasar + waktu per token prompt (perkiraan 4 karakter per token).
+    """
+
+    def __init__(self, latency_seconds: float = 0.3, per_prompt_token_seconds: float = 0.00005):
+        self.latency_seconds = latency_seconds
+        self.per_prompt_token_seconds = per_prompt_token_seconds
+        self.calls = 0
+
+    def invoke(self, prompt) -> AIMessage:
+        prompt_text = str(prompt)
+        delay = self.latency_seconds + self.per_prompt_token_seconds * (len(prompt_text) / 4)
+        if delay > 0:
+            time.sleep(delay)
+        self.calls += 1
+        digest = hashlib.sha1(prompt_text.encode()).hexdigest()[:12]
+        return AIMessage(content=f"Jawaban sintetis ({digest}) berdasarkan {len(prompt_text)} karakter konteks.")
@@ -0,0 +1,290 @@
+# file: benchmarks/run.py
+"""
+Suite benchmark offline untuk pipeline RAG.
+
+Semua skenario memakai FakeEmbeddings/FakeChatModel dan korpus PDF sintetis,
+sehingga bisa dijalankan di laptop atau CI tanpa Google API maupun PostgreSQL.
+
+Contoh:
+    python -m benchmarks.run --output bench_output.json
+    python -m benchmarks.run --scenario chat_load --concurrency 16 --requests 400
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+
+# config.py mewajibkan variabel ini; benchmark tidak pernah memakainya
+os.environ.setdefault("DATABASE_URL", "postgresql://benchmark@localhost/benchmark")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-offline")
+
+from app.services.rag_service import RAGService
+from benchmarks.corpus import generate_corpus
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+
+QUESTIONS = [
+    "Apa metode penelitian yang digunakan?",
+    "Bagaimana hasil analisis regresi pada penelitian ini?",
+    "Sebutkan variabel yang signifikan.",
+    "Apa kesimpulan mengenai efektivitas pembelajaran?",
+    "Bagaimana validitas dan reliabilitas kuesioner diuji?",
+]
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def _latency_summary(samples: list[float]) -> dict:
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+        "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+        "p90_ms": round(_percentile(samples, 90) * 1000, 3),
+        "p99_ms": round(_percentile(samples, 99) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3) if samples else 0.0,
+    }
+
+class BenchContext:
+    def __init__(self, args, workdir: Path):
+        self.args = args
+        self.workdir = workdir
+        self._warmed = False
+
+    def new_service(self, name: str) -> RAGService:
+        if not self._warmed:
+            self._warmed = True
+            self._warm_process()
+        return self._create_service(name)
+
+    def _warm_process(self):
+        """
+        Satu rebuild kecil tanpa diukur: pypdf, langchain, dan FAISS diimpor secara lazy,
+        jadi tanpa ini titik pertama skenario ikut menanggung biaya impor sekali jalan.
+        """
+        rows = self.corpus("warmup", 1, seed=0)
+        self._create_service("warmup").rebuild_index_from_rows(rows)
+
+    def _create_service(self, name: str) -> RAGService:
+        embeddings = FakeEmbeddings(
+            dim=self.args.embedding_dim,
+            latency_seconds=self.args.embed_latency,
+            per_text_seconds=self.args.embed_per_text,
+        )
+        llm = FakeChatModel(latency_seconds=self.args.llm_latency)
+        index_path = self.workdir / name / "index.faiss"
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        service = RAGService(embeddings=embeddings, llm=llm, index_path=index_path)
+        service.warm_up()
+        return service
+
+    def corpus(self, name: str, num_documents: int, seed: int = 42) -> list[dict]:
+        return generate_corpus(
+            self.workdir / "corpus" / name, num_documents,
+            pages_per_document=self.args.pages_per_document, seed=seed,
+        )
+
+def scenario_index_build(ctx: BenchContext) -> dict:
+    """Waktu rebuild penuh terhadap ukuran korpus."""
+    points = []
+    for size in ctx.args.corpus_sizes:
+        rows = ctx.corpus(f"build_{size}", size)
+        service = ctx.new_service(f"build_{size}")
+        start = time.perf_counter()
+        service.rebuild_index_from_rows(rows)
+        elapsed = time.perf_counter() - start
+        vectors = service.vector_store.index.ntotal if service.vector_store else 0
+        points.append({
+            "documents": size,
+            "vectors": vectors,
+            "seconds": round(elapsed, 4),
+            "docs_per_second": round(size / elapsed, 3) if elapsed else None,
+        })
+    return {"points": points}
+
+def scenario_incremental_vs_full(ctx: BenchContext) -> dict:
+    """
+    Menambah dokumen baru: add_documents (jalur background task POST /documents/upload)
+    dibanding rebuild penuh (jalur hapus dokumen oleh admin dan `ingest.py --from-db`).
+    """
+    base_rows = ctx.corpus("incremental_base", ctx.args.base_documents, seed=1)
+    new_rows = ctx.corpus("incremental_new", ctx.args.new_documents, seed=2)
+
+    full = ctx.new_service("full")
+    full.rebuild_index_from_rows(base_rows)
+    start = time.perf_counter()
+    full.rebuild_index_from_rows(base_rows + new_rows)
+    full_seconds = time.perf_counter() - start
+
+    incremental = ctx.new_service("incremental")
+    incremental.rebuild_index_from_rows(base_rows)
+    start = time.perf_counter()
+    incremental.add_documents(new_rows)
+    incremental_seconds = time.perf_counter() - start
+
+    return {
+        "base_documents": len(base_rows),
+        "new_documents": len(new_rows),
+        "full_rebuild_seconds": round(full_seconds, 4),
+        "incremental_seconds": round(incremental_seconds, 4),
+        "speedup": round(full_seconds / incremental_seconds, 2) if incremental_seconds else None,
+        "vectors_match": full.vector_store.index.ntotal == incremental.vector_store.index.ntotal,
+    }
+
+def scenario_chat_load(ctx: BenchContext) -> dict:
+    """Latensi p50/p99 invoke_chain di bawah beban konkuren (seperti threadpool FastAPI)."""
+    rows = ctx.corpus("chat", ctx.args.base_documents)
+    service = ctx.new_service("chat")
+    service.rebuild_index_from_rows(rows)
+
+    def one_request(i: int) -> float:
+        start = time.perf_counter()
+        service.invoke_chain(QUESTIONS[i % len(QUESTIONS)], [])
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=ctx.args.concurrency) as pool:
+        samples = list(pool.map(one_request, range(ctx.args.requests)))
+    wall = time.perf_counter() - start
+
+    return {
+        "concurrency": ctx.args.concurrency,
+        "requests": ctx.args.requests,
+        "wall_seconds": round(wall, 4),
+        "throughput_rps": round(len(samples) / wall, 3) if wall else None,
+        "latency": _latency_summary(samples),
+    }
+
+def scenario_upload_throughput(ctx: BenchContext) -> dict:
+    """
+    Throughput unggah seperti POST /documents/upload: setiap request menulis `--upload-batch` file,
+    lalu background task meng-embed hanya file tersebut lewat add_documents ke index yang terus tumbuh.
+    Selama unggahan berjalan, `--upload-readers` thread terus melakukan chat pada index yang sama
+    (seperti threadpool FastAPI), sehingga penukaran index di tengah pencarian ikut teruji.
+    """
+    base_rows = ctx.corpus("upload_base", ctx.args.base_documents, seed=4)
+    source_rows = ctx.corpus("upload_source", ctx.args.new_documents, seed=3)
+    service = ctx.new_service("upload")
+    service.rebuild_index_from_rows(base_rows)
+    upload_dir = ctx.workdir / "upload_target"
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    stop_event = threading.Event()
+    search_samples = []
+
+    def reader(offset: int):
+        i = offset
+        while not stop_event.is_set():
+            search_start = time.perf_counter()
+            service.invoke_chain(QUESTIONS[i % len(QUESTIONS)], [])
+            search_samples.append(time.perf_counter() - search_start)
+            i += 1
+
+    readers = [threading.Thread(target=reader, args=(n,), daemon=True) for n in range(ctx.args.upload_readers)]
+    for thread in readers:
+        thread.start()
+
+    total_bytes = 0
+    samples = []
+    start = time.perf_counter()
+    try:
+        for offset in range(0, len(source_rows), ctx.args.upload_batch):
+            request_start = time.perf_counter()
+            new_rows = []
+            for row in source_rows[offset:offset + ctx.args.upload_batch]:
+                content = Path(row["file_path"]).read_bytes()
+                target = upload_dir / Path(row["file_path"]).name
+                target.write_bytes(content)
+                total_bytes += len(content)
+                new_rows.append({**row, "file_path": str(target)})
+            service.add_documents(new_rows)
+            samples.append(time.perf_counter() - request_start)
+        wall = time.perf_counter() - start
+    finally:
+        stop_event.set()
+        for thread in readers:
+            thread.join()
+
+    return {
+        "base_documents": len(base_rows),
+        "documents": len(source_rows),
+        "documents_per_request": ctx.args.upload_batch,
+        "concurrent_readers": ctx.args.upload_readers,
+        "bytes": total_bytes,
+        "wall_seconds": round(wall, 4),
+        "docs_per_second": round(len(source_rows) / wall, 3) if wall else None,
+        "mb_per_second": round(total_bytes / wall / 1_000_000, 3) if wall else None,
+        "latency": _latency_summary(samples),
+        "chat_latency_during_upload": _latency_summary(search_samples),
+    }
+
+SCENARIOS = {
+    "index_build": scenario_index_build,
+    "incremental_vs_full": scenario_incremental_vs_full,
+    "chat_load": scenario_chat_load,
+    "upload_throughput": scenario_upload_throughput,
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline RAG UNNES Document Chat.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Skenario yang dijalankan (bisa diulang). Default: semua.")
+    parser.add_argument("--output", type=Path, help="Tulis hasil JSON ke file ini (default: stdout).")
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--pages-per-document", type=int, default=5)
+    parser.add_argument("--base-documents", type=int, default=50)
+    parser.add_argument("--new-documents", type=int, default=10)
+    parser.add_argument("--upload-batch", type=int, default=1, help="Jumlah file per request upload.")
+    parser.add_argument("--upload-readers", type=int, default=4, help="Thread chat yang berjalan selama skenario upload.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--embedding-dim", type=int, default=768)
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="Latensi dasar per panggilan embedding (detik).")
+    parser.add_argument("--embed-per-text", type=float, default=0.002, help="Latensi tambahan per teks (detik).")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Latensi dasar per panggilan LLM (detik).")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    selected = args.scenario or list(SCENARIOS)
+    results = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {key: (str(value) if isinstance(value, Path) else value) for key, value in vars(args).items()},
+        "scenarios": {},
+    }
+
+    # Log print() dari RAGService dialihkan ke stderr agar stdout hanya berisi JSON
+    with tempfile.TemporaryDirectory(prefix="unnes-bench-") as tmp, redirect_stdout(sys.stderr):
+        ctx = BenchContext(args, Path(tmp))
+        for name in selected:
+            print(f"⏱️  Menjalankan skenario: {name}", file=sys.stderr)
+            start = time.perf_counter()
+            results["scenarios"][name] = SCENARIOS[name](ctx)
+            results["scenarios"][name]["scenario_seconds"] = round(time.perf_counter() - start, 4)
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(payload + "\n")
+        print(f"✅ Hasil benchmark ditulis ke {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
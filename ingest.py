@@ -0,0 +1,330 @@
+# file: ingest.py
+"""
+CLI ingest massal: membangun index FAISS di luar proses web.
+
+Ekstraksi PDF berjalan paralel di beberapa proses, embedding paralel di beberapa thread,
+dan progres disimpan ke checkpoint sehingga ingest yang terputus bisa dilanjutkan.
+Index akhir dipublikasikan secara atomik; worker web memuatnya otomatis (lihat index_watcher).
+
+Contoh:
+    python ingest.py --from-db                               # rebuild penuh dari tabel documents
+    python ingest.py --dir /mnt/arsip/skripsi --owner admin_unnes
+    python ingest.py --dir /mnt/arsip/skripsi --owner admin_unnes --resume
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.append(str(current_dir))
+
+try:
+    from psycopg2.extras import DictCursor
+    from app.core import config
+    from app.db.session import get_db_connection
+    from app.services.rag_service import (
+        _load_and_split_single_document,
+        create_embeddings,
+        docstore_ids_for_documents,
+        index_file_lock,
+        index_version,
+        load_vector_store,
+        publish_vector_store,
+    )
+    from app.services.search_service import store_document_chunks
+except ImportError as e:
+    print(f"❌ Gagal mengimpor modul: {e}. Pastikan dependensi di requirements.txt sudah terpasang.")
+    sys.exit(1)
+
+DEFAULT_CHECKPOINT_DIR = config.VECTOR_STORE_DIR / "ingest_checkpoint"
+MANIFEST_NAME = "manifest.json"
+PARTIAL_INDEX_PREFIX = "partial"
+
+def _write_manifest(checkpoint_dir: Path, manifest: dict):
+    tmp_path = checkpoint_dir / f"{MANIFEST_NAME}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_path, checkpoint_dir / MANIFEST_NAME)
+
+def _load_manifest(checkpoint_dir: Path) -> dict | None:
+    path = checkpoint_dir / MANIFEST_NAME
+    return json.loads(path.read_text()) if path.exists() else None
+
+def _documents_from_db() -> list[dict]:
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=DictCursor)
+        cursor.execute("SELECT id, file_path, filename FROM documents ORDER BY upload_date ASC")
+        rows = [dict(row) for row in cursor.fetchall()]
+        cursor.close()
+    return [row for row in rows if Path(row["file_path"]).exists()]
+
+def _plan_directory(source_dir: Path, owner: str) -> list[dict]:
+    """
+    Menentukan id dan lokasi tujuan setiap PDF di `source_dir` tanpa menyentuh tabel documents.
+    Rencana ini disimpan di manifest lebih dulu, sehingga pendaftaran yang terputus bisa diulang
+    tanpa membuat baris ganda.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM users WHERE username = %s", (owner,))
+        owner_exists = cursor.fetchone() is not None
+        cursor.close()
+    if not owner_exists:
+        raise SystemExit(f"❌ Pengguna '{owner}' tidak ditemukan.")
+
+    user_dir = config.UPLOAD_DIR / owner
+    pdf_files = sorted(p for p in source_dir.rglob("*") if p.is_file() and p.suffix.lower() == ".pdf")
+    rows = []
+    for source in pdf_files:
+        doc_id = str(uuid.uuid4())
+        target = user_dir / f"{doc_id}{source.suffix.lower()}"
+        rows.append({"id": doc_id, "file_path": str(target.resolve()), "filename": source.name, "source": str(source)})
+    return rows
+
+def _register_documents(manifest: dict, checkpoint_dir: Path, owner: str, batch_size: int):
+    """
+    Menyalin PDF ke folder upload milik `owner` dan mencatatnya di tabel documents
+    (is_indexed=FALSE sampai index dipublikasikan), sama seperti alur upload lewat API.
+    Penyalinan dilakukan di luar transaksi dan setiap batch di-commit sendiri, karena trigger counter
+    mengunci baris app_counters('documents') sampai commit dan upload lewat API ikut menunggu.
+    """
+    documents = manifest["documents"]
+    (config.UPLOAD_DIR / owner).mkdir(parents=True, exist_ok=True)
+    for start in range(manifest["registered"], len(documents), batch_size):
+        batch = documents[start:start + batch_size]
+        values = []
+        for row in batch:
+            target = Path(row["file_path"])
+            shutil.copy2(row["source"], target)
+            values.append((row["id"], owner, row["filename"], row["file_path"], datetime.now(), target.stat().st_size, False))
+
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # ON CONFLICT: batch yang sudah di-commit sebelum crash (tapi belum tercatat di manifest) aman diulang
+            cursor.executemany(
+                "INSERT INTO documents (id, username, filename, file_path, upload_date, file_size, is_indexed) VALUES (%s, %s, %s, %s, %s, %s, %s) ON CONFLICT (id) DO NOTHING",
+                values
+            )
+            conn.commit()
+            cursor.close()
+        manifest["registered"] = start + len(batch)
+        _write_manifest(checkpoint_dir, manifest)
+        print(f"  📝 {manifest['registered']}/{len(documents)} dokumen terdaftar")
+
+def _extract(row: dict) -> list:
+    chunks = _load_and_split_single_document(Path(row["file_path"]))
+    for chunk in chunks:
+        chunk.metadata.update({"doc_id": row["id"], "filename": row["filename"]})
+    return chunks
+
+def _embed_parallel(embeddings, texts: list[str], batch_size: int, pool: ThreadPoolExecutor) -> list[list[float]]:
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    vectors = []
+    for batch_vectors in pool.map(embeddings.embed_documents, batches):
+        vectors.extend(batch_vectors)
+    return vectors
+
+def _load_partial(manifest: dict, checkpoint_dir: Path, embeddings):
+    """Menggabungkan index checkpoint per batch (partial-NNNN) menjadi satu index."""
+    from langchain_community.vectorstores import FAISS
+
+    partial = None
+    for name in manifest["batches"]:
+        batch_index = FAISS.load_local(
+            folder_path=str(checkpoint_dir), index_name=name,
+            embeddings=embeddings, allow_dangerous_deserialization=True
+        )
+        if partial is None:
+            partial = batch_index
+        else:
+            partial.merge_from(batch_index)
+    return partial
+
+def _process(manifest: dict, checkpoint_dir: Path, embeddings, args):
+    from langchain_community.vectorstores import FAISS
+
+    done = set(manifest["done"])
+    pending = [row for row in manifest["documents"] if row["id"] not in done]
+    total = len(manifest["documents"])
+    print(f"📚 {len(done)}/{total} dokumen sudah selesai, {len(pending)} tersisa.")
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as extract_pool, ThreadPoolExecutor(max_workers=args.embed_workers) as embed_pool:
+        for start in range(0, len(pending), args.batch_docs):
+            batch = pending[start:start + args.batch_docs]
+            chunks = [chunk for doc_chunks in extract_pool.map(_extract, batch) for chunk in doc_chunks]
+
+            if chunks:
+                store_document_chunks(chunks)
+                texts = [chunk.page_content for chunk in chunks]
+                vectors = _embed_parallel(embeddings, texts, args.embed_batch_size, embed_pool)
+                metadatas = [chunk.metadata for chunk in chunks]
+                # Setiap batch disimpan ke file checkpoint sendiri, jadi biaya checkpoint sebanding dengan
+                # ukuran batch, bukan ukuran seluruh index. Manifest menjadi penanda batch yang sudah lengkap.
+                batch_name = f"{PARTIAL_INDEX_PREFIX}-{len(manifest['batches']):04d}"
+                batch_index = FAISS.from_embeddings(list(zip(texts, vectors)), embeddings, metadatas=metadatas)
+                batch_index.save_local(folder_path=str(checkpoint_dir), index_name=batch_name)
+                manifest["batches"].append(batch_name)
+
+            manifest["done"].extend(row["id"] for row in batch)
+            manifest["chunks"] += len(chunks)
+            _write_manifest(checkpoint_dir, manifest)
+
+            finished = len(manifest["done"])
+            rate = (finished - len(done)) / (time.perf_counter() - started)
+            print(f"  ✔ {finished}/{total} dokumen, {manifest['chunks']} chunk ({rate:.2f} dokumen/detik)")
+
+def _documents_uploaded_since(manifest: dict) -> list[dict]:
+    """Dokumen yang diunggah lewat API setelah snapshot mode --from-db diambil."""
+    known_ids = [row["id"] for row in manifest["documents"]]
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=DictCursor)
+        cursor.execute(
+            "SELECT id, file_path, filename FROM documents WHERE upload_date >= %s AND NOT (id = ANY(%s)) ORDER BY upload_date ASC",
+            (datetime.fromisoformat(manifest["created_at"]), known_ids)
+        )
+        rows = [dict(row) for row in cursor.fetchall()]
+        cursor.close()
+    return [row for row in rows if Path(row["file_path"]).exists()]
+
+def _deleted_documents(doc_ids: list[str]) -> set[str]:
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM documents WHERE id = ANY(%s)", (doc_ids,))
+        existing = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+    return set(doc_ids) - existing
+
+def _add_late_uploads(manifest: dict, partial, embeddings) -> list[str]:
+    """Mode --from-db: menambahkan dokumen yang diunggah setelah snapshot. Mengembalikan id-nya."""
+    late_rows = _documents_uploaded_since(manifest)
+    if not late_rows:
+        return []
+    print(f"📥 {len(late_rows)} dokumen diunggah selama ingest berjalan, ditambahkan sebelum publikasi...")
+    chunks = [chunk for row in late_rows for chunk in _extract(row)]
+    if chunks:
+        store_document_chunks(chunks)
+        texts = [chunk.page_content for chunk in chunks]
+        vectors = embeddings.embed_documents(texts)
+        partial.add_embeddings(list(zip(texts, vectors)), metadatas=[chunk.metadata for chunk in chunks])
+    return [row["id"] for row in late_rows]
+
+def _drop_deleted_documents(manifest: dict, partial):
+    """Mengeluarkan vektor dokumen yang dihapus (admin) selama ingest berjalan."""
+    deleted = _deleted_documents(manifest["done"])
+    if not deleted:
+        return
+    print(f"🗑️ {len(deleted)} dokumen dihapus selama ingest berjalan, dikeluarkan dari index.")
+    stale_ids = docstore_ids_for_documents(partial, deleted)
+    if stale_ids:
+        partial.delete(stale_ids)
+
+def _publish(manifest: dict, partial, embeddings, index_path: Path):
+    # Baca → gabung → publikasi → tandai is_indexed dijalankan di bawah kunci antarproses,
+    # sehingga upload atau rebuild di worker web tidak bisa menimpa hasil ingest (dan sebaliknya).
+    with index_file_lock(index_path):
+        indexed_ids = list(manifest["done"])
+        if manifest["mode"] == "db":
+            indexed_ids += _add_late_uploads(manifest, partial, embeddings)
+        _drop_deleted_documents(manifest, partial)
+        if manifest["mode"] == "dir" and index_version(index_path) is not None:
+            # Index yang sedang aktif dibaca saat publikasi (bukan di awal), agar upload
+            # yang terjadi selama ingest berjalan tidak ikut tertimpa.
+            current = load_vector_store(index_path, embeddings)
+            current.merge_from(partial)
+            partial = current
+
+        publish_vector_store(partial, index_path)
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE documents SET is_indexed = TRUE WHERE id = ANY(%s)", (indexed_ids,))
+            conn.commit()
+            cursor.close()
+    print(f"✅ Index dipublikasikan ke {index_path} ({partial.index.ntotal} vektor). Worker web akan memuatnya otomatis.")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest massal dokumen ke index FAISS tanpa melalui API.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-db", action="store_true", help="Bangun ulang index penuh dari semua baris tabel documents.")
+    source.add_argument("--dir", type=Path, help="Direktori berisi PDF yang akan didaftarkan dan ditambahkan ke index.")
+    parser.add_argument("--owner", help="Username pemilik dokumen untuk mode --dir.")
+    parser.add_argument("--index-path", type=Path, default=config.FAISS_INDEX_PATH)
+    parser.add_argument("--checkpoint-dir", type=Path, default=DEFAULT_CHECKPOINT_DIR)
+    resume = parser.add_mutually_exclusive_group()
+    resume.add_argument("--resume", action="store_true", help="Lanjutkan dari checkpoint yang ada.")
+    resume.add_argument("--restart", action="store_true", help="Hapus checkpoint yang ada dan mulai dari awal.")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="Jumlah proses ekstraksi PDF.")
+    parser.add_argument("--embed-workers", type=int, default=4, help="Jumlah thread pemanggil API embedding.")
+    parser.add_argument("--embed-batch-size", type=int, default=100, help="Jumlah chunk per panggilan embedding.")
+    parser.add_argument("--batch-docs", type=int, default=32, help="Jumlah dokumen per checkpoint.")
+    parser.add_argument("--nice", type=int, default=10, help="Prioritas CPU lebih rendah agar tidak mengganggu proses web.")
+    args = parser.parse_args(argv)
+    if args.dir and not args.owner:
+        parser.error("--owner wajib diisi untuk mode --dir")
+    return args
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.nice:
+        os.nice(args.nice)
+
+    checkpoint_dir = args.checkpoint_dir
+    manifest = _load_manifest(checkpoint_dir)
+    if manifest and args.restart:
+        shutil.rmtree(checkpoint_dir)
+        manifest = None
+    elif manifest and not args.resume:
+        print(f"❌ Checkpoint ditemukan di {checkpoint_dir}. Gunakan --resume untuk melanjutkan atau --restart untuk mengulang.")
+        return 1
+    elif args.resume and not manifest:
+        print(f"⚠️ Tidak ada checkpoint di {checkpoint_dir}, memulai dari awal.")
+
+    if manifest is None:
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        # Dicatat sebelum snapshot diambil; dokumen yang diunggah sesudahnya disusulkan saat publikasi
+        created_at = datetime.now().astimezone().isoformat()
+        if args.from_db:
+            documents = _documents_from_db()
+        else:
+            documents = _plan_directory(args.dir, args.owner)
+        manifest = {
+            "mode": "db" if args.from_db else "dir",
+            "created_at": created_at,
+            "owner": args.owner,
+            "documents": documents,
+            "registered": len(documents) if args.from_db else 0,
+            "done": [],
+            "batches": [],
+            "chunks": 0,
+        }
+        _write_manifest(checkpoint_dir, manifest)
+
+    if manifest["registered"] < len(manifest["documents"]):
+        print(f"📥 Mendaftarkan PDF untuk '{manifest['owner']}'...")
+        _register_documents(manifest, checkpoint_dir, manifest["owner"], args.batch_docs)
+
+    if not manifest["documents"]:
+        print("⚠️ Tidak ada dokumen untuk diproses.")
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        return 0
+
+    embeddings = create_embeddings()
+    _process(manifest, checkpoint_dir, embeddings, args)
+    partial = _load_partial(manifest, checkpoint_dir, embeddings)
+    if partial is None:
+        print("⚠️ Tidak ada teks yang bisa diekstrak; index tidak diubah.")
+        return 1
+
+    _publish(manifest, partial, embeddings, args.index_path)
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,89 @@ except ImportError as e:
     print(f"❌ Gagal mengimpor modul: {e}. Pastikan file app/core/config.py dan app/core/security.py ada.")
     sys.exit(1)
 
+def _create_partition_functions(cursor):
+    """Fungsi pemeliharaan partisi bulanan chat_history; dipanggil ulang oleh app/services/maintenance.py."""
+    cursor.execute('''
+    CREATE OR REPLACE FUNCTION chat_history_ensure_partitions(months_ahead INTEGER DEFAULT 3)
+    RETURNS INTEGER LANGUAGE plpgsql AS $$
+    DECLARE
+        month_start DATE;
+        partition_name TEXT;
+        created INTEGER := 0;
+    BEGIN
+        FOR i IN 0..months_ahead LOOP
+            month_start := (date_trunc('month', NOW()) + make_interval(months => i))::date;
+            partition_name := format('chat_history_%s', to_char(month_start, 'YYYY_MM'));
+            IF to_regclass(partition_name) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF chat_history FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, (month_start + INTERVAL '1 month')::date
+                );
+                created := created + 1;
+            END IF;
+        END LOOP;
+        RETURN created;
+    END $$;
+    ''')
+    cursor.execute('''
+    CREATE OR REPLACE FUNCTION chat_history_apply_retention(retain_months INTEGER, archive BOOLEAN DEFAULT TRUE)
+    RETURNS INTEGER LANGUAGE plpgsql AS $$
+    DECLARE
+        cutoff DATE := (date_trunc('month', NOW()) - make_interval(months => retain_months))::date;
+        part RECORD;
+        removed INTEGER := 0;
+    BEGIN
+        IF retain_months <= 0 THEN
+            RETURN 0;
+        END IF;
+        FOR part IN
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'chat_history'::regclass
+              AND c.relname ~ '^chat_history_[0-9]{4}_[0-9]{2}$'
+              AND to_date(right(c.relname, 7), 'YYYY_MM') < cutoff
+        LOOP
+            EXECUTE format('ALTER TABLE chat_history DETACH PARTITION %I', part.relname);
+            IF archive THEN
+                EXECUTE format('ALTER TABLE %I SET SCHEMA chat_archive', part.relname);
+            ELSE
+                EXECUTE format('DROP TABLE %I', part.relname);
+            END IF;
+            removed := removed + 1;
+        END LOOP;
+        RETURN removed;
+    END $$;
+    ''')
+
+def _create_counter_triggers(cursor):
+    cursor.execute('''
+    CREATE OR REPLACE FUNCTION bump_app_counter() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE app_counters SET value = value + 1 WHERE name = TG_ARGV[0];
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE app_counters SET value = value - 1 WHERE name = TG_ARGV[0];
+        END IF;
+        RETURN NULL;
+    END $$;
+    ''')
+    cursor.execute('''
+    CREATE OR REPLACE FUNCTION chat_history_track_session() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO chat_sessions (username, session_id, started_at, last_message_at, message_count)
+        VALUES (NEW.username, NEW.session_id, NEW.timestamp, NEW.timestamp, 1)
+        ON CONFLICT (username, session_id) DO UPDATE
+        SET last_message_at = GREATEST(chat_sessions.last_message_at, EXCLUDED.last_message_at),
+            message_count = chat_sessions.message_count + 1;
+        RETURN NULL;
+    END $$;
+    ''')
+    cursor.execute("CREATE TRIGGER users_counter AFTER INSERT OR DELETE ON users FOR EACH ROW EXECUTE FUNCTION bump_app_counter('users');")
+    cursor.execute("CREATE TRIGGER documents_counter AFTER INSERT OR DELETE ON documents FOR EACH ROW EXECUTE FUNCTION bump_app_counter('documents');")
+    cursor.execute("CREATE TRIGGER chat_sessions_counter AFTER INSERT OR DELETE ON chat_sessions FOR EACH ROW EXECUTE FUNCTION bump_app_counter('chat_sessions');")
+    cursor.execute("CREATE TRIGGER chat_history_session_tracker AFTER INSERT ON chat_history FOR EACH ROW EXECUTE FUNCTION chat_history_track_session();")
+
 def setup_database():
     try:
         print("🚀 Mencoba terhubung ke database PostgreSQL...")
@@ -23,7 +106,8 @@ def setup_database():
         print("✅ Berhasil terhubung.")
         
         print("⚠️  Menghapus tabel lama (jika ada)...")
-        cursor.execute('DROP TABLE IF EXISTS chat_history, documents, users CASCADE;')
+        cursor.execute('DROP TABLE IF EXISTS document_chunks, app_counters, chat_sessions, chat_session_memory, chat_history, documents, users CASCADE;')
+        cursor.execute('DROP SCHEMA IF EXISTS chat_archive CASCADE;')
         
         print("🏗️  Membuat struktur tabel baru...")
         cursor.execute('''
@@ -48,18 +132,74 @@ def setup_database():
             is_indexed BOOLEAN NOT NULL DEFAULT FALSE
         );
         ''')
+        # chat_history dipartisi per bulan agar query & retensi hanya menyentuh partisi yang relevan.
+        # Primary key partitioned table wajib memuat kolom partisi (timestamp).
         cursor.execute('''
         CREATE TABLE chat_history (
-            id SERIAL PRIMARY KEY,
+            id BIGSERIAL,
             session_id VARCHAR(255) NOT NULL,
             username VARCHAR(255) NOT NULL REFERENCES users(username) ON DELETE CASCADE,
             message TEXT NOT NULL,
             response TEXT NOT NULL,
-            timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            document_ids JSONB
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+            document_ids JSONB,
+            search_tsv TSVECTOR GENERATED ALWAYS AS (
+                to_tsvector('{ts_config}', message || ' ' || response)
+            ) STORED,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp);
+        '''.format(ts_config=config.SEARCH_TEXT_CONFIG))
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_history_user_session ON chat_history (username, session_id, timestamp);')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_history_search ON chat_history USING GIN (search_tsv);')
+        cursor.execute('CREATE SCHEMA chat_archive;')
+        _create_partition_functions(cursor)
+        cursor.execute('SELECT chat_history_ensure_partitions(%s);', (config.CHAT_HISTORY_PARTITIONS_AHEAD,))
+
+        # Ringkasan per sesi & counter global dipelihara oleh trigger, sehingga dashboard admin
+        # dan riwayat chat tidak perlu COUNT(*) / COUNT(DISTINCT) atas seluruh chat_history.
+        cursor.execute('''
+        CREATE TABLE chat_sessions (
+            username VARCHAR(255) NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+            session_id VARCHAR(255) NOT NULL,
+            started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            last_message_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            message_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, session_id)
+        );
+        ''')
+        cursor.execute('''
+        CREATE TABLE app_counters (
+            name VARCHAR(64) PRIMARY KEY,
+            value BIGINT NOT NULL DEFAULT 0
+        );
+        ''')
+        cursor.execute("INSERT INTO app_counters (name, value) VALUES ('users', 0), ('documents', 0), ('chat_sessions', 0);")
+        _create_counter_triggers(cursor)
+        # Teks chunk disimpan agar bisa dicari dengan full-text search (diisi saat dokumen diindeks)
+        cursor.execute('''
+        CREATE TABLE document_chunks (
+            id BIGSERIAL PRIMARY KEY,
+            document_id VARCHAR(36) NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+            chunk_index INTEGER NOT NULL,
+            page INTEGER,
+            content TEXT NOT NULL,
+            search_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('{ts_config}', content)) STORED,
+            UNIQUE (document_id, chunk_index)
+        );
+        '''.format(ts_config=config.SEARCH_TEXT_CONFIG))
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_document_chunks_search ON document_chunks USING GIN (search_tsv);')
+        # Memori bergulir per sesi (ringkasan + giliran terakhir), diperbarui setelah setiap giliran chat
+        cursor.execute('''
+        CREATE TABLE chat_session_memory (
+            username VARCHAR(255) NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+            session_id VARCHAR(255) NOT NULL,
+            summary TEXT NOT NULL DEFAULT '',
+            recent_turns JSONB NOT NULL DEFAULT '[]'::jsonb,
+            turn_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            PRIMARY KEY (username, session_id)
         );
         ''')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_history_session_id ON chat_history (session_id);')
         
         print("🔑 Membuat akun admin default...")
         admin_pass_hash = get_password_hash(config.DEFAULT_ADMIN_PASSWORD)
@@ -81,4 +221,9 @@ def setup_database():
         return False
 
 if __name__ == "__main__":
-    setup_database()
+    if "--maintenance" in sys.argv[1:]:
+        # Untuk cron: membuat partisi bulan depan dan menerapkan retensi tanpa menyentuh data lain
+        from app.services.maintenance import run_chat_history_maintenance
+        print(f"🧹 Maintenance chat_history: {run_chat_history_maintenance()}")
+    else:
+        setup_database()